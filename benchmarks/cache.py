@@ -0,0 +1,81 @@
+"""Compare the throughput of the on-disk caches.
+
+Every cache is filled with the same responses in batches (like the response iterator does)
+and then read back in batches and one by one.
+
+Run with:
+
+    python benchmarks/cache.py [NUM_RESPONSES] [BODY_SIZE]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mure.cache import Cache, DiskCache, SQLiteCache
+from mure.models import Request, Response
+
+BATCH_SIZE = 100
+
+
+def responses(num_responses: int, body_size: int) -> list[tuple[Request, Response]]:
+    """Create requests with responses of the given body size."""
+    return [
+        (
+            Request("GET", f"http://mure.invalid/{i}"),
+            Response(
+                ok=True,
+                status=200,
+                reason="OK",
+                url=f"http://mure.invalid/{i}",
+                text="x" * body_size,
+            ),
+        )
+        for i in range(num_responses)
+    ]
+
+
+def run(cache: Cache, pairs: list[tuple[Request, Response]]) -> tuple[float, float, float]:
+    """Time batched writes, batched reads and single reads (operations per second)."""
+    requests = [request for request, _ in pairs]
+
+    start = time.perf_counter()
+    for i in range(0, len(pairs), BATCH_SIZE):
+        cache.set_many(pairs[i : i + BATCH_SIZE])
+    writes = len(pairs) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, len(requests), BATCH_SIZE):
+        cache.get_many(requests[i : i + BATCH_SIZE])
+    batched_reads = len(requests) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for request in requests:
+        cache.get(request)
+    reads = len(requests) / (time.perf_counter() - start)
+
+    return writes, batched_reads, reads
+
+
+def main(num_responses: int, body_size: int):
+    """Print the throughput of the on-disk caches."""
+    pairs = responses(num_responses, body_size)
+    print(f"{num_responses} responses of {body_size} bytes, batches of {BATCH_SIZE}")
+    print(f"{'cache':>12} {'writes/s':>10} {'batched reads/s':>16} {'reads/s':>10}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, cache in (
+            ("DiskCache", DiskCache(Path(directory, "mure-cache.shelve"))),
+            ("SQLiteCache", SQLiteCache(Path(directory, "mure-cache.sqlite"))),
+        ):
+            writes, batched_reads, reads = run(cache, pairs)
+            print(f"{name:>12} {writes:>10.0f} {batched_reads:>16.0f} {reads:>10.0f}")
+            del cache
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1_000,
+    )
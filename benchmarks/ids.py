@@ -0,0 +1,59 @@
+"""Measure how many request identifiers (cache keys) are computed per second.
+
+The identifier is computed for every cache lookup and for coalescing duplicate requests, so
+it is on the hot path of every request. Requests of a few typical shapes are created fresh
+for every identifier, because identifiers are memoized per request. The best of a few runs
+is reported.
+
+Run with:
+
+    python benchmarks/ids.py [NUM_REQUESTS]
+"""
+
+import sys
+import time
+from collections.abc import Callable
+
+from mure.models import Request
+
+URL = "https://example.org/search"
+REPEAT = 5
+
+SHAPES: dict[str, Callable[[int], Request]] = {
+    "url": lambda i: Request("GET", f"{URL}?page={i}"),
+    "params": lambda i: Request("GET", URL, params={"q": "mure", "page": str(i)}),
+    "json": lambda i: Request("POST", URL, json={"q": "mure", "page": i, "tags": ["a", "b"]}),
+    "vary": lambda i: Request(
+        "GET",
+        f"{URL}?page={i}",
+        headers={"Accept": "application/json", "Accept-Language": "de"},
+        vary=("accept", "accept-language"),
+    ),
+}
+
+
+def run(create: Callable[[int], Request], num_requests: int) -> float:
+    """Return the identifiers computed per second."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        requests = [create(i) for i in range(num_requests)]
+
+        start = time.perf_counter()
+        for request in requests:
+            request.id  # noqa: B018
+        best = min(best, time.perf_counter() - start)
+
+    return num_requests / best
+
+
+def main(num_requests: int):
+    """Print the number of request ids computed per second for each shape of request."""
+    print(f"{num_requests} requests")
+    print(f"{'shape':>10} {'ids/s':>10}")
+
+    for name, create in SHAPES.items():
+        print(f"{name:>10} {run(create, num_requests):>10.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,90 @@
+"""Measure the memory used per request and response object.
+
+Creates the objects like the response iterator does (a request with its memoized id, a
+response with a small body and a few headers) and reports the memory allocated per object
+with `tracemalloc`, including the strings it references. For comparison, the same objects are
+also created from equivalent classes that keep their attributes in a `__dict__` instead of
+`__slots__` (like the classes did before).
+
+Run with:
+
+    python benchmarks/memory.py [NUM_OBJECTS]
+"""
+
+import sys
+import tracemalloc
+from collections.abc import Callable
+from functools import partial
+
+from mure.models import Request, Response
+
+HEADERS = {"Content-Type": "application/json", "ETag": '"abc"', "Cache-Control": "max-age=60"}
+
+
+def unslotted(cls: type) -> type:
+    """Create an equivalent class that keeps its attributes in a `__dict__` instead of slots."""
+    namespace = {
+        name: value
+        for name, value in vars(cls).items()
+        if name != "__slots__" and name not in cls.__slots__
+    }
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+def request(i: int, cls: type[Request] = Request) -> Request:
+    """Create a request with a query string and its memoized id."""
+    request = cls("GET", f"https://example.org/{i}", params={"page": "1"})
+    request.id  # noqa: B018
+    return request
+
+
+def response(i: int, cls: type[Response] = Response) -> Response:
+    """Create a response with a small JSON body and a few headers."""
+    return cls(
+        ok=True,
+        status=200,
+        reason="OK",
+        url=f"https://example.org/{i}",
+        content=b'{"id": %d}' % i,
+        encoding="utf-8",
+        headers=HEADERS,
+        http_version="HTTP/1.1",
+    )
+
+
+def measure(create: Callable[[int], object], num_objects: int) -> float:
+    """Return the bytes allocated per object."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    objects = [create(i) for i in range(num_objects)]
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # the list itself is not part of the objects
+    return (after - before - sys.getsizeof(objects)) / len(objects)
+
+
+def shallow(obj: object) -> int:
+    """Return the size of an object and its `__dict__` (if any) in bytes."""
+    attributes = getattr(obj, "__dict__", None)
+    return sys.getsizeof(obj) + (sys.getsizeof(attributes) if attributes is not None else 0)
+
+
+def main(num_objects: int):
+    """Print the memory used per request and response object, with and without slots."""
+    print(f"{num_objects} objects")
+    print(f"{'object':>10} {'slots':>6} {'bytes/object':>14} {'shallow bytes':>14}")
+
+    for name, create, cls in (("Request", request, Request), ("Response", response, Response)):
+        for slots in (False, True):
+            create_object = create if slots else partial(create, cls=unslotted(cls))
+            print(
+                f"{name:>10} {slots!s:>6} {measure(create_object, num_objects):>14.0f} "
+                f"{shallow(create_object(0)):>14}"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,96 @@
+"""Measure the per-request overhead of the scheduler without any network I/O.
+
+Every request is answered by an in-process `httpx.MockTransport`, so the measured time is
+spent in httpx and in mure's scheduling only. The time of plain `AsyncClient.request` calls
+against the same transport, with as many of them in flight at once as the batch size allows,
+is subtracted to get the overhead added by mure. Every request has its own URL, so none of
+them are coalesced, and the fastest of several runs is reported.
+
+Run with:
+
+    python benchmarks/scheduler.py [NUM_REQUESTS]
+"""
+
+import asyncio
+import sys
+import time
+
+import httpx
+
+from mure.iterator import ResponseIterator
+from mure.models import Request
+
+URL = "http://mure.invalid/"
+# number of runs per measurement, the fastest one is reported
+REPEAT = 5
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    """Answer every request right away with a small body."""
+    return httpx.Response(200, content=b"ok")
+
+
+def client() -> httpx.AsyncClient:
+    """Create a client that answers requests in-process."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def baseline(num_requests: int, batch_size: int) -> float:
+    """Time concurrent requests with a plain client (seconds per request).
+
+    At most `batch_size` requests are in flight at once, like in the response iterator.
+    """
+
+    async def run() -> float:
+        semaphore = asyncio.Semaphore(batch_size)
+
+        async def fetch(session: httpx.AsyncClient, i: int):
+            async with semaphore:
+                response = await session.request("GET", f"{URL}{i}")
+                await response.aread()
+
+        async with client() as session:
+            start = time.perf_counter()
+            await asyncio.gather(*(fetch(session, i) for i in range(num_requests)))
+            return time.perf_counter() - start
+
+    return min(asyncio.run(run()) for _ in range(REPEAT)) / num_requests
+
+
+def scheduler(num_requests: int, batch_size: int, *, ordered: bool) -> float:
+    """Time requests through the response iterator (seconds per request)."""
+
+    async def run() -> float:
+        # distinct URLs, so that no requests are coalesced
+        requests = (Request("GET", f"{URL}{i}") for i in range(num_requests))
+
+        async with client() as session:
+            start = time.perf_counter()
+            async for _ in ResponseIterator(
+                requests, batch_size=batch_size, ordered=ordered, client=session
+            ):
+                pass
+            return time.perf_counter() - start
+
+    return min(asyncio.run(run()) for _ in range(REPEAT)) / num_requests
+
+
+def main(num_requests: int):
+    """Print the overhead per request for different batch sizes, ordered and unordered."""
+    print(f"{num_requests} requests")
+    print(
+        f"{'batch_size':>10} {'ordered':>8} {'httpx µs':>10} {'mure µs':>10} {'overhead µs':>12}"
+    )
+
+    for batch_size in (1, 10, 100, 1000):
+        reference = baseline(num_requests, batch_size)
+        for ordered in (True, False):
+            elapsed = scheduler(num_requests, batch_size, ordered=ordered)
+            print(
+                f"{batch_size:>10} {ordered!s:>8} {reference * 1e6:>10.1f} "
+                f"{elapsed * 1e6:>10.1f} {(elapsed - reference) * 1e6:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -1,6 +1,13 @@
+from mure.core import adelete as adelete
+from mure.core import aget as aget
+from mure.core import ahead as ahead
+from mure.core import apatch as apatch
+from mure.core import apost as apost
+from mure.core import aput as aput
 from mure.core import delete as delete
 from mure.core import get as get
 from mure.core import head as head
 from mure.core import patch as patch
 from mure.core import post as post
 from mure.core import put as put
+from mure.session import Session as Session
@@ -1,15 +1,42 @@
+import asyncio
+import contextlib
+import json
+import os
+import queue
 import shelve
+import sqlite3
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Self
 
 from mure.logging import Logger
-from mure.models import Request, Response
+from mure.models import Freshness, Headers, Request, Response
 
 LOGGER = Logger(__name__)
 
 
 class Cache(ABC):
-    """Abstract class for a cache to store responses."""
+    """Abstract class for a cache to store responses.
+
+    Subclasses have to implement `has`, `get` and `set`. `get` is a single lookup that returns
+    None on a miss, so callers never need to call `has` first. The bulk methods `get_many` and
+    `set_many` fall back to `get` and `set` and should be overridden by caches that can look up
+    or save many responses more efficiently, e.g. in a single transaction.
+
+    The asynchronous methods (`aget`, `aset`, `aget_many` and `aset_many`) are used on the event
+    loop. By default, they run their synchronous counterparts in a dedicated thread per cache,
+    so blocking I/O never stalls the requests in flight. Caches that never block, or that can
+    do asynchronous I/O themselves, should override them.
+
+    Caches that buffer writes should override `flush`, which is called when a response
+    iterator using the cache is closed.
+    """
 
     @abstractmethod
     def has(self, request: Request) -> bool:
@@ -53,12 +80,182 @@ class Cache(ABC):
             Response to save to the cache.
         """
 
+    def get_many(self, requests: Iterable[Request]) -> list[Response | None]:
+        """Get the responses for the specified requests from the cache.
+
+        Parameters
+        ----------
+        requests : Iterable[Request]
+            Requests to get responses from the cache.
+
+        Returns
+        -------
+        list[Response | None]
+            Response from the cache for each request, or None if it is not in the cache.
+        """
+        return [self.get(request) for request in requests]
+
+    def set_many(self, pairs: Iterable[tuple[Request, Response]]):
+        """Save requests and their responses to the cache.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[Request, Response]]
+            Requests and their responses to save to the cache.
+        """
+        for request, response in pairs:
+            self.set(request, response)
+
+    async def aget(self, request: Request) -> Response | None:
+        """Get the response for the specified request from the cache without blocking.
+
+        Parameters
+        ----------
+        request : Request
+            Request to get response from the cache.
+
+        Returns
+        -------
+        Response | None
+            Response from the cache or None if the request is not in the cache.
+        """
+        return await self._offload(self.get, request)
+
+    async def aset(self, request: Request, response: Response):
+        """Save a request and its response to the cache without blocking.
+
+        Parameters
+        ----------
+        request : Request
+            Request to save to the cache.
+        response : Response
+            Response to save to the cache.
+        """
+        await self._offload(self.set, request, response)
+
+    async def aget_many(self, requests: Iterable[Request]) -> list[Response | None]:
+        """Get the responses for the specified requests from the cache without blocking.
+
+        Parameters
+        ----------
+        requests : Iterable[Request]
+            Requests to get responses from the cache.
+
+        Returns
+        -------
+        list[Response | None]
+            Response from the cache for each request, or None if it is not in the cache.
+        """
+        return await self._offload(self.get_many, list(requests))
+
+    async def aset_many(self, pairs: Iterable[tuple[Request, Response]]):
+        """Save requests and their responses to the cache without blocking.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[Request, Response]]
+            Requests and their responses to save to the cache.
+        """
+        await self._offload(self.set_many, list(pairs))
+
+    def flush(self):  # noqa: B027
+        """Save responses that are buffered by the cache (if any)."""
+
+    async def aflush(self):
+        """Save responses that are buffered by the cache (if any) without blocking."""
+        # caches that do not buffer writes have nothing to flush, so no thread is needed
+        if type(self).flush is not Cache.flush:
+            await self._offload(self.flush)
+
+    async def _offload(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Run a function in the cache's thread.
+
+        All offloaded calls run in the same thread one after another, so they never overlap
+        each other. Synchronous calls from other threads, e.g. a cache that is shared with code
+        outside of the event loop, can still run concurrently with them, so such caches have
+        to guard their state themselves (like `SQLiteCache` does).
+
+        Parameters
+        ----------
+        function : Callable[..., Any]
+            Function to run.
+        *args : Any
+            Arguments to pass to the function.
+
+        Returns
+        -------
+        Any
+            Return value of the function.
+        """
+        # subclasses are not required to call the constructor, so create the thread lazily
+        if (executor := getattr(self, "_executor", None)) is None:
+            executor = self._executor = ThreadPoolExecutor(1, thread_name_prefix="mure-cache")
+
+        return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+
 
 class MemoryCache(Cache):
-    """Simple in-memory cache."""
+    """In-memory cache, optionally bounded in size and lifetime of its entries.
+
+    If the cache is full, the least recently used entries are evicted first. Responses with
+    caching metadata (see `CachePolicy`) expire once they are stale, unless they can be
+    revalidated (i.e. they have an `ETag` or `Last-Modified`), and never later than `ttl`.
+    Expired entries are dropped when they are looked up (or evicted like any other entry). All
+    operations take constant time.
+
+    Parameters
+    ----------
+    max_entries : int | None, optional
+        Maximum number of responses in the cache, by default None, i.e. unlimited.
+    max_bytes : int | None, optional
+        Maximum total size of the (raw) response bodies in bytes, by default None, i.e.
+        unlimited.
+    ttl : float | None, optional
+        Seconds until a response expires at the latest, by default None, i.e. responses only
+        expire with their own lifetime.
 
-    def __init__(self):
-        self._cache = {}
+    Attributes
+    ----------
+    hits : int
+        Number of lookups that found a response.
+    misses : int
+        Number of lookups that did not find a (fresh) response.
+    evictions : int
+        Number of responses evicted because the cache was full.
+    size : int
+        Total size of the response bodies in bytes.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+
+        # response, its size and when it expires (by the monotonic clock) per request id,
+        # ordered from least to most recently used
+        self._cache: OrderedDict[str, tuple[Response, int, float | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of responses in the cache."""
+        return len(self._cache)
+
+    def __repr__(self) -> str:
+        """Return the string representation of the cache."""
+        return (
+            f"<MemoryCache({len(self)} responses, {self.size} bytes, "
+            f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions)>"
+        )
 
     def has(self, request: Request) -> bool:
         """Check if a request (and its corresponding response) is in the cache.
@@ -73,7 +270,7 @@ class MemoryCache(Cache):
         bool
             True if the request is in the cache; otherwise, False.
         """
-        return request.id in self._cache
+        return self._lookup(request.id) is not None
 
     def get(self, request: Request) -> Response | None:
         """Get the response for the specified request from the cache.
@@ -88,7 +285,14 @@ class MemoryCache(Cache):
         Response | None
             Response from the cache or None if the request is not in the cache.
         """
-        return self._cache.get(request.id)
+        response = self._lookup(request.id)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._cache.move_to_end(request.id)
+
+        return response
 
     def set(self, request: Request, response: Response):
         """Save a request and its response to the cache.
@@ -100,21 +304,1208 @@ class MemoryCache(Cache):
         response : Response
             Response to save to the cache.
         """
-        self._cache[request.id] = response
+        self._remove(request.id)
 
+        size = len(response.content)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # would evict everything else and still not fit
+            return
 
-class DiskCache(MemoryCache):
-    """Simple on-disk cache."""
+        ttl = self.ttl
+        if (freshness := response.freshness) is not None and not (
+            freshness.etag or freshness.last_modified
+        ):
+            # stale responses without validators are of no use, so they expire with their
+            # lifetime (which started when the server generated them)
+            lifetime = freshness.stored + freshness.lifetime - time.time()
+            ttl = lifetime if ttl is None else min(ttl, lifetime)
 
-    def __init__(self, path: Path = Path("mure-cache.shelve")):
-        super().__init__()
+        expires = time.monotonic() + ttl if ttl is not None else None
+
+        self._cache[request.id] = (response, size, expires)
+        self.size += size
+
+        while (self.max_entries is not None and len(self._cache) > self.max_entries) or (
+            self.max_bytes is not None and self.size > self.max_bytes
+        ):
+            _, (_, evicted, _) = self._cache.popitem(last=False)
+            self.size -= evicted
+            self.evictions += 1
+
+    def _lookup(self, id_: str) -> Response | None:
+        """Get a fresh response from the cache, dropping it if it expired.
+
+        Parameters
+        ----------
+        id_ : str
+            ID of the request.
+
+        Returns
+        -------
+        Response | None
+            Response from the cache or None if there is no fresh one.
+        """
+        entry = self._cache.get(id_)
+        if entry is None:
+            return None
+
+        response, _, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            self._remove(id_)
+            return None
+
+        return response
+
+    def _remove(self, id_: str):
+        """Remove a response from the cache if it is there.
+
+        Parameters
+        ----------
+        id_ : str
+            ID of the request.
+        """
+        if (entry := self._cache.pop(id_, None)) is not None:
+            self.size -= entry[1]
+
+    async def aget(self, request: Request) -> Response | None:
+        """Get the response for the specified request from the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to get response from the cache.
+
+        Returns
+        -------
+        Response | None
+            Response from the cache or None if the request is not in the cache.
+        """
+        return self.get(request)
+
+    async def aset(self, request: Request, response: Response):
+        """Save a request and its response to the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to save to the cache.
+        response : Response
+            Response to save to the cache.
+        """
+        self.set(request, response)
+
+    async def aget_many(self, requests: Iterable[Request]) -> list[Response | None]:
+        """Get the responses for the specified requests from the cache.
+
+        Parameters
+        ----------
+        requests : Iterable[Request]
+            Requests to get responses from the cache.
+
+        Returns
+        -------
+        list[Response | None]
+            Response from the cache for each request, or None if it is not in the cache.
+        """
+        return self.get_many(requests)
+
+    async def aset_many(self, pairs: Iterable[tuple[Request, Response]]):
+        """Save requests and their responses to the cache.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[Request, Response]]
+            Requests and their responses to save to the cache.
+        """
+        self.set_many(pairs)
+
+    async def aflush(self):
+        """Save responses that are buffered by the cache (if any)."""
+        self.flush()
+
+
+class DiskCache(Cache):
+    """Simple on-disk cache.
 
+    Reads and writes from the event loop are done in a separate thread. Some `dbm` backends
+    (e.g. `dbm.sqlite3`, the default since Python 3.13) can only be used in the thread that
+    opened them, so the shelf is opened in the cache's thread and synchronous calls from
+    other threads are run there as well.
+    """
+
+    def __init__(self, path: Path = Path("mure-cache.shelve")):
         self.path = path.resolve()
         if self.path.exists():
             LOGGER.warning(f"Cache ({self.path}) already exists")
 
-        self._cache = shelve.open(str(self.path))
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="mure-cache")
+        self._thread, self._cache = self._executor.submit(self._open).result()
+
+    def __del__(self):
+        """Close the cache."""
+        if (executor := getattr(self, "_executor", None)) is None or not hasattr(self, "_cache"):
+            return
+
+        closed = None
+        if threading.get_ident() != self._thread:
+            # the thread is gone when the interpreter shuts down
+            with contextlib.suppress(RuntimeError):
+                closed = executor.submit(self._cache.close)
+
+        # if the cache is collected along with its thread, the thread may stop before it gets
+        # to close the shelf, so wait for it and close the shelf here instead
+        executor.shutdown(wait=closed is not None)
+        if closed is None or not closed.done() or closed.exception() is not None:
+            # backends that are bound to the thread have written everything already
+            with contextlib.suppress(sqlite3.Error):
+                self._cache.close()
+
+    def _open(self) -> tuple[int, shelve.Shelf]:
+        """Open the shelf in the current thread."""
+        return threading.get_ident(), shelve.open(str(self.path))
+
+    def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Run a function in the thread that opened the shelf and wait for its result.
+
+        Parameters
+        ----------
+        function : Callable[..., Any]
+            Function to run.
+        *args : Any
+            Arguments to pass to the function.
+
+        Returns
+        -------
+        Any
+            Return value of the function.
+        """
+        if threading.get_ident() == self._thread:
+            return function(*args)
+
+        return self._executor.submit(function, *args).result()
+
+    def has(self, request: Request) -> bool:
+        """Check if a request (and its corresponding response) is in the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to check if it's in the cache.
+
+        Returns
+        -------
+        bool
+            True if the request is in the cache; otherwise, False.
+        """
+        return self._run(self._cache.__contains__, request.id)
+
+    def get(self, request: Request) -> Response | None:
+        """Get the response for the specified request from the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to get response from the cache.
+
+        Returns
+        -------
+        Response | None
+            Response from the cache or None if the request is not in the cache.
+        """
+        return self._run(self._cache.get, request.id)
+
+    def set(self, request: Request, response: Response):
+        """Save a request and its response to the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to save to the cache.
+        response : Response
+            Response to save to the cache.
+        """
+        self._run(self._cache.__setitem__, request.id, response)
+
+    def set_many(self, pairs: Iterable[tuple[Request, Response]]):
+        """Save requests and their responses to the cache and write them to disk at once.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[Request, Response]]
+            Requests and their responses to save to the cache.
+        """
+        self._run(self._set_many, list(pairs))
+
+    def _set_many(self, pairs: list[tuple[Request, Response]]):
+        """Save requests and their responses in the thread that opened the shelf."""
+        for request, response in pairs:
+            self._cache[request.id] = response
+
+        self._cache.sync()
+
+
+class SQLiteCache(Cache):
+    """On-disk cache backed by SQLite.
+
+    The database uses write-ahead logging, so multiple processes can read and write the same
+    cache concurrently: readers never block and writers wait for each other (up to `timeout`).
+    Responses are stored in columns instead of being pickled, and `set_many` saves a whole
+    batch in a single transaction. Reads and writes from the event loop are done in a separate
+    thread.
+
+    Parameters
+    ----------
+    path : Path, optional
+        Path of the database, by default `mure-cache.sqlite`.
+    timeout : float, optional
+        Seconds to wait for a lock held by another connection, by default 30.
+    max_entries : int | None, optional
+        Maximum number of responses in the cache, by default None, i.e. unlimited. If the cache
+        is full, the responses saved first are evicted first.
+
+    Attributes
+    ----------
+    evictions : int
+        Number of responses evicted because the cache was full.
+    """
+
+    # maximum number of parameters per statement supported by all SQLite versions
+    MAX_VARIABLES = 999
+
+    def __init__(
+        self,
+        path: Path = Path("mure-cache.sqlite"),
+        *,
+        timeout: float = 30,
+        max_entries: int | None = None,
+    ):
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int | None = None
+
+        self.path = path.resolve()
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.evictions = 0
+
+        with self._lock:
+            self._connect()
+
+    def __enter__(self) -> Self:
+        """Enter the cache context.
+
+        Returns
+        -------
+        SQLiteCache
+            The cache itself.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Close the cache when leaving the context."""
+        self.close()
 
     def __del__(self):
         """Close the cache."""
-        self._cache.close()
+        self.close()
+
+    def close(self):
+        """Close the connection to the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def has(self, request: Request) -> bool:
+        """Check if a request (and its corresponding response) is in the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to check if it's in the cache.
+
+        Returns
+        -------
+        bool
+            True if the request is in the cache; otherwise, False.
+        """
+        with self._lock:
+            cursor = self._connect().execute(
+                "SELECT 1 FROM responses WHERE id = ?",
+                (request.id,),
+            )
+            return cursor.fetchone() is not None
+
+    def get(self, request: Request) -> Response | None:
+        """Get the response for the specified request from the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to get response from the cache.
+
+        Returns
+        -------
+        Response | None
+            Response from the cache or None if the request is not in the cache.
+        """
+        return self.get_many([request])[0]
+
+    def set(self, request: Request, response: Response):
+        """Save a request and its response to the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to save to the cache.
+        response : Response
+            Response to save to the cache.
+        """
+        self.set_many([(request, response)])
+
+    def get_many(self, requests: Iterable[Request]) -> list[Response | None]:
+        """Get the responses for the specified requests from the cache.
+
+        Parameters
+        ----------
+        requests : Iterable[Request]
+            Requests to get responses from the cache.
+
+        Returns
+        -------
+        list[Response | None]
+            Response from the cache for each request, or None if it is not in the cache.
+        """
+        ids = [request.id for request in requests]
+        unique = list(dict.fromkeys(ids))
+        rows = {}
+
+        with self._lock:
+            connection = self._connect()
+            for i in range(0, len(unique), self.MAX_VARIABLES):
+                batch = unique[i : i + self.MAX_VARIABLES]
+                cursor = connection.execute(
+                    "SELECT id, status, reason, url, headers, http_version, body, encoding, etag, "
+                    "last_modified, stored, lifetime, must_revalidate FROM responses "
+                    f"WHERE id IN ({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                rows.update((row[0], row) for row in cursor)
+
+        return [self._to_response(rows[id_]) if id_ in rows else None for id_ in ids]
+
+    def set_many(self, pairs: Iterable[tuple[Request, Response]]):
+        """Save requests and their responses to the cache in a single transaction.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[Request, Response]]
+            Requests and their responses to save to the cache.
+        """
+        now = time.time()
+        rows = [self._to_row(request, response, now) for request, response in pairs]
+
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO responses "
+                    "(id, status, reason, url, headers, http_version, body, encoding, etag, "
+                    "last_modified, stored, lifetime, must_revalidate, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+                if self.max_entries is not None:
+                    # keep only the most recently saved responses, the oldest ones are found
+                    # with the index without looking at the others
+                    (count,) = connection.execute("SELECT count FROM response_count").fetchone()
+                    if count > self.max_entries:
+                        cursor = connection.execute(
+                            "DELETE FROM responses WHERE id IN (SELECT id FROM responses "
+                            "ORDER BY created_at LIMIT ?)",
+                            (count - self.max_entries,),
+                        )
+                        self.evictions += cursor.rowcount
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection to the database, (re)connecting if necessary.
+
+        A connection is never shared across processes, e.g. if the cache is created before
+        worker processes are forked, each of them opens its own connection on first use.
+
+        Returns
+        -------
+        sqlite3.Connection
+            Connection to the database.
+        """
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+
+        # the connection is used from the calling thread and the cache's thread, access is
+        # serialized with the lock
+        self._connection = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+        )
+        self._pid = os.getpid()
+
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        # responses replaced by INSERT OR REPLACE fire the delete trigger (see below)
+        self._connection.execute("PRAGMA recursive_triggers = ON")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "id TEXT PRIMARY KEY, "
+                "status INTEGER NOT NULL, "
+                "reason TEXT, "
+                "url TEXT NOT NULL, "
+                "headers TEXT, "
+                "http_version TEXT, "
+                "body BLOB NOT NULL, "
+                "encoding TEXT, "
+                "etag TEXT, "
+                "last_modified TEXT, "
+                "stored REAL, "
+                "lifetime REAL, "
+                "must_revalidate INTEGER, "
+                "created_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)"
+            )
+
+            # the number of responses is kept up to date by triggers, so that it does not have
+            # to be counted for every write (it is counted once for databases without it)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS response_count (count INTEGER NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses "
+                "BEGIN UPDATE response_count SET count = count + 1; END"
+            )
+            self._connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses "
+                "BEGIN UPDATE response_count SET count = count - 1; END"
+            )
+            self._connection.execute(
+                "INSERT INTO response_count SELECT count(*) FROM responses "
+                "WHERE NOT EXISTS (SELECT 1 FROM response_count)"
+            )
+
+        return self._connection
+
+    @staticmethod
+    def _to_row(request: Request, response: Response, now: float) -> tuple:
+        """Create a row of the database from a response.
+
+        Parameters
+        ----------
+        request : Request
+            Request of the response.
+        response : Response
+            Response to save.
+        now : float
+            Current time in seconds since the epoch.
+
+        Returns
+        -------
+        tuple
+            Columns id, status, reason, url, headers, http_version, body, encoding, etag,
+            last_modified, stored, lifetime, must_revalidate and created_at.
+        """
+        freshness = response.freshness
+        headers = response.headers.multi_items()
+        return (
+            request.id,
+            response.status,
+            response.reason,
+            response.url,
+            json.dumps(headers, separators=(",", ":")) if headers else None,
+            response.http_version,
+            response.content,
+            response.encoding,
+            freshness.etag if freshness is not None else None,
+            freshness.last_modified if freshness is not None else None,
+            freshness.stored if freshness is not None else None,
+            freshness.lifetime if freshness is not None else None,
+            freshness.must_revalidate if freshness is not None else None,
+            now,
+        )
+
+    @staticmethod
+    def _to_response(row: tuple) -> Response:
+        """Create a response from a row of the database.
+
+        Parameters
+        ----------
+        row : tuple
+            Columns id, status, reason, url, headers, http_version, body, encoding, etag,
+            last_modified, stored, lifetime and must_revalidate.
+
+        Returns
+        -------
+        Response
+            The cached response.
+        """
+        _, status, reason, url, headers, http_version, body, encoding, *metadata = row
+        etag, last_modified, stored, lifetime, must_revalidate = metadata
+
+        freshness = None
+        if stored is not None:
+            freshness = Freshness(
+                stored=stored,
+                lifetime=lifetime,
+                etag=etag,
+                last_modified=last_modified,
+                must_revalidate=bool(must_revalidate),
+            )
+
+        return Response(
+            ok=200 <= status < 300,
+            status=status,
+            reason=reason,
+            url=url,
+            content=body,
+            encoding=encoding,
+            headers=Headers(json.loads(headers)) if headers else None,
+            http_version=http_version,
+            freshness=freshness,
+        )
+
+
+class TieredCache(Cache):
+    """Cache with multiple tiers, e.g. a small in-memory cache in front of an on-disk cache.
+
+    Lookups go through the tiers from first to last, and a response found in a later tier is
+    promoted to all tiers in front of it. Writes go to all tiers at once (write-through), or
+    with `write_behind` to the first tier right away and to the other tiers in batches of
+    `write_batch` responses. Each tier keeps its own limits and eviction policy.
+
+    Parameters
+    ----------
+    *tiers : Cache
+        Caches from the fastest to the slowest.
+    write_behind : bool, optional
+        If True, save responses to all but the first tier in batches, by default False. Call
+        `flush` (or use the cache as context manager) to save the remaining responses. They
+        are not saved when the cache is garbage collected.
+    write_batch : int, optional
+        Number of responses to save to the later tiers at once, by default 100.
+
+    Attributes
+    ----------
+    lookups : list[int]
+        Number of lookups per tier.
+    hits : list[int]
+        Number of lookups per tier that found a response.
+
+    Examples
+    --------
+    >>> cache = TieredCache(MemoryCache(max_entries=10_000), SQLiteCache())
+    """
+
+    def __init__(self, *tiers: Cache, write_behind: bool = False, write_batch: int = 100):
+        if not tiers:
+            raise ValueError("At least one tier is required")
+
+        # responses saved to the first tier only so far, keyed by request id
+        self._pending: dict[str, tuple[Request, Response]] = {}
+
+        self.tiers = tiers
+        self.write_behind = write_behind
+        self.write_batch = write_batch
+
+        self.lookups = [0] * len(tiers)
+        self.hits = [0] * len(tiers)
+
+    def __repr__(self) -> str:
+        """Return the string representation of the cache."""
+        ratios = ", ".join(f"{ratio:.0%}" for ratio in self.hit_ratios)
+        return f"<TieredCache({len(self.tiers)} tiers, hit ratios {ratios})>"
+
+    def __enter__(self) -> Self:
+        """Enter the cache context.
+
+        Returns
+        -------
+        TieredCache
+            The cache itself.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Save pending responses when leaving the context."""
+        self.flush()
+
+    @property
+    def hit_ratios(self) -> list[float]:
+        """Return the share of lookups per tier that found a response.
+
+        Returns
+        -------
+        list[float]
+            Hit ratio per tier, 0.0 for tiers without lookups.
+        """
+        return [
+            hits / lookups if lookups else 0.0
+            for hits, lookups in zip(self.hits, self.lookups, strict=True)
+        ]
+
+    def has(self, request: Request) -> bool:
+        """Check if a request (and its corresponding response) is in the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to check if it's in the cache.
+
+        Returns
+        -------
+        bool
+            True if the request is in any tier; otherwise, False.
+        """
+        return request.id in self._pending or any(tier.has(request) for tier in self.tiers)
+
+    def get(self, request: Request) -> Response | None:
+        """Get the response for the specified request from the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to get response from the cache.
+
+        Returns
+        -------
+        Response | None
+            Response from the cache or None if the request is not in the cache.
+        """
+        return self.get_many([request])[0]
+
+    def set(self, request: Request, response: Response):
+        """Save a request and its response to the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to save to the cache.
+        response : Response
+            Response to save to the cache.
+        """
+        self.set_many([(request, response)])
+
+    def get_many(self, requests: Iterable[Request]) -> list[Response | None]:
+        """Get the responses for the specified requests from the first tier that has them.
+
+        Parameters
+        ----------
+        requests : Iterable[Request]
+            Requests to get responses from the cache.
+
+        Returns
+        -------
+        list[Response | None]
+            Response from the cache for each request, or None if it is not in the cache.
+        """
+        requests = list(requests)
+        responses: list[Response | None] = [None] * len(requests)
+        missing = list(range(len(requests)))
+
+        for level, tier in enumerate(self.tiers):
+            if not missing:
+                break
+
+            if level == 1 and self._has_pending(requests, missing):
+                self.flush()
+
+            found = tier.get_many([requests[i] for i in missing])
+            missing, promotions = self._record(level, requests, responses, missing, found)
+
+            if promotions:
+                for faster in self.tiers[:level]:
+                    faster.set_many(promotions)
+
+        return responses
+
+    def set_many(self, pairs: Iterable[tuple[Request, Response]]):
+        """Save requests and their responses to the tiers.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[Request, Response]]
+            Requests and their responses to save to the cache.
+        """
+        pairs = list(pairs)
+        self.tiers[0].set_many(pairs)
+
+        if not self.write_behind:
+            for tier in self.tiers[1:]:
+                tier.set_many(pairs)
+        elif self._defer(pairs):
+            self.flush()
+
+    def flush(self):
+        """Save the responses pending for all but the first tier."""
+        if self._pending:
+            pairs = list(self._pending.values())
+            self._pending.clear()
+
+            for tier in self.tiers[1:]:
+                tier.set_many(pairs)
+
+    async def aget(self, request: Request) -> Response | None:
+        """Get the response for the specified request from the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to get response from the cache.
+
+        Returns
+        -------
+        Response | None
+            Response from the cache or None if the request is not in the cache.
+        """
+        return (await self.aget_many([request]))[0]
+
+    async def aset(self, request: Request, response: Response):
+        """Save a request and its response to the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to save to the cache.
+        response : Response
+            Response to save to the cache.
+        """
+        await self.aset_many([(request, response)])
+
+    async def aget_many(self, requests: Iterable[Request]) -> list[Response | None]:
+        """Get the responses for the specified requests from the first tier that has them.
+
+        Every tier is accessed with its own asynchronous methods, i.e. in-memory tiers are
+        looked up on the event loop and only slower tiers in a separate thread.
+
+        Parameters
+        ----------
+        requests : Iterable[Request]
+            Requests to get responses from the cache.
+
+        Returns
+        -------
+        list[Response | None]
+            Response from the cache for each request, or None if it is not in the cache.
+        """
+        requests = list(requests)
+        responses: list[Response | None] = [None] * len(requests)
+        missing = list(range(len(requests)))
+
+        for level, tier in enumerate(self.tiers):
+            if not missing:
+                break
+
+            if level == 1 and self._has_pending(requests, missing):
+                await self.aflush()
+
+            found = await tier.aget_many([requests[i] for i in missing])
+            missing, promotions = self._record(level, requests, responses, missing, found)
+
+            if promotions:
+                for faster in self.tiers[:level]:
+                    await faster.aset_many(promotions)
+
+        return responses
+
+    async def aset_many(self, pairs: Iterable[tuple[Request, Response]]):
+        """Save requests and their responses to the tiers.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[Request, Response]]
+            Requests and their responses to save to the cache.
+        """
+        pairs = list(pairs)
+        await self.tiers[0].aset_many(pairs)
+
+        if not self.write_behind:
+            for tier in self.tiers[1:]:
+                await tier.aset_many(pairs)
+        elif self._defer(pairs):
+            await self.aflush()
+
+    async def aflush(self):
+        """Save the responses pending for all but the first tier."""
+        if self._pending:
+            pairs = list(self._pending.values())
+            self._pending.clear()
+
+            for tier in self.tiers[1:]:
+                await tier.aset_many(pairs)
+
+    def _defer(self, pairs: list[tuple[Request, Response]]) -> bool:
+        """Queue responses for all but the first tier.
+
+        Parameters
+        ----------
+        pairs : list[tuple[Request, Response]]
+            Requests and their responses to save later.
+
+        Returns
+        -------
+        bool
+            True if a full batch is pending; otherwise, False.
+        """
+        self._pending.update((request.id, (request, response)) for request, response in pairs)
+        return len(self._pending) >= self.write_batch
+
+    def _has_pending(self, requests: list[Request], missing: list[int]) -> bool:
+        """Check if any of the missing requests is waiting to be saved to the later tiers.
+
+        Parameters
+        ----------
+        requests : list[Request]
+            Requests that are looked up.
+        missing : list[int]
+            Indices of the requests not found in the first tier.
+
+        Returns
+        -------
+        bool
+            True if a response of the missing requests is pending; otherwise, False.
+        """
+        return bool(self._pending) and any(requests[i].id in self._pending for i in missing)
+
+    def _record(
+        self,
+        level: int,
+        requests: list[Request],
+        responses: list[Response | None],
+        missing: list[int],
+        found: list[Response | None],
+    ) -> tuple[list[int], list[tuple[Request, Response]]]:
+        """Record the result of a lookup in a tier.
+
+        Parameters
+        ----------
+        level : int
+            Index of the tier.
+        requests : list[Request]
+            Requests that are looked up.
+        responses : list[Response | None]
+            Responses found so far, updated in place.
+        missing : list[int]
+            Indices of the requests looked up in the tier.
+        found : list[Response | None]
+            Response from the tier for each missing request.
+
+        Returns
+        -------
+        tuple[list[int], list[tuple[Request, Response]]]
+            Indices of the requests still missing, and the responses to promote.
+        """
+        self.lookups[level] += len(missing)
+
+        still_missing = []
+        promotions = []
+        for i, response in zip(missing, found, strict=True):
+            if response is None:
+                still_missing.append(i)
+            else:
+                responses[i] = response
+                promotions.append((requests[i], response))
+
+        self.hits[level] += len(promotions)
+        return still_missing, promotions
+
+
+class _Writer(threading.Thread):
+    """Thread that saves queued responses to a cache in batches."""
+
+    def __init__(self, cache: Cache, max_batch: int, max_delay: float):
+        super().__init__(name="mure-cache-writer", daemon=True)
+
+        self.cache = cache
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        # queued (request, response) pairs, events to set once everything before them is
+        # saved, and None to stop
+        self.queue: queue.SimpleQueue[tuple[Request, Response] | threading.Event | None] = (
+            queue.SimpleQueue()
+        )
+        # responses queued but not saved yet, keyed by request id
+        self.pending: dict[str, tuple[Request, Response]] = {}
+        self.pending_lock = threading.Lock()
+        # the cache is used by the writer and by lookups in other threads
+        self.cache_lock = threading.Lock()
+
+    def run(self):
+        """Save batches of queued responses until the writer is stopped."""
+        stopped = False
+        while not stopped:
+            batch, events, stopped = self._collect()
+            if batch:
+                self._save(batch)
+            for event in events:
+                event.set()
+
+    def stop(self):
+        """Save all queued responses and stop the writer."""
+        if self.is_alive():
+            self.queue.put(None)
+            self.join()
+
+    def _collect(self) -> tuple[list[tuple[Request, Response]], list[threading.Event], bool]:
+        """Wait for the next batch of queued responses.
+
+        Returns
+        -------
+        tuple[list[tuple[Request, Response]], list[threading.Event], bool]
+            Requests and their responses to save, events to set afterwards, and True if the
+            writer was stopped.
+        """
+        batch = []
+        item = self.queue.get()
+        deadline = time.monotonic() + self.max_delay
+
+        while True:
+            if item is None:
+                return batch, [], True
+            if isinstance(item, threading.Event):
+                return batch, [item], False
+
+            batch.append(item)
+            if len(batch) >= self.max_batch:
+                return batch, [], False
+
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return batch, [], False
+
+    def _save(self, batch: list[tuple[Request, Response]]):
+        """Save a batch of responses to the cache.
+
+        Parameters
+        ----------
+        batch : list[tuple[Request, Response]]
+            Requests and their responses to save.
+        """
+        try:
+            with self.cache_lock:
+                self.cache.set_many(batch)
+            LOGGER.debug(f"Saved {len(batch)} responses in cache")
+        except Exception as error:
+            LOGGER.error(f"Failed to save {len(batch)} responses in cache: {error!r}")
+        finally:
+            with self.pending_lock:
+                for request, response in batch:
+                    # keep responses that were queued again in the meantime
+                    if self.pending.get(request.id, (None, None))[1] is response:
+                        del self.pending[request.id]
+
+
+class WriteBehindCache(Cache):
+    """Cache that saves responses to another cache in a background thread.
+
+    Saving a response only queues it, and a writer thread saves the queued responses in
+    batches of up to `max_batch` responses (or whatever is queued after `max_delay` seconds)
+    with a single `set_many`, e.g. in a single transaction of a `SQLiteCache`. Queued responses
+    are visible to lookups right away. Remaining responses are saved on `flush` and `close`,
+    when a response iterator using the cache is closed, and at interpreter exit.
+
+    Parameters
+    ----------
+    cache : Cache
+        Cache to save the responses to.
+    max_batch : int, optional
+        Maximum number of responses to save at once, by default 100.
+    max_delay : float, optional
+        Maximum time in seconds a response is queued before its batch is saved, by default
+        0.05.
+
+    Examples
+    --------
+    >>> cache = WriteBehindCache(SQLiteCache(), max_batch=500, max_delay=0.1)
+    """
+
+    def __init__(self, cache: Cache, *, max_batch: int = 100, max_delay: float = 0.05):
+        self.cache = cache
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._writer = _Writer(cache, max_batch, max_delay)
+        self._writer.start()
+
+        # stop the writer (saving the queued responses) when the cache is garbage collected
+        # or at interpreter exit, whichever comes first
+        self._finalizer = weakref.finalize(self, self._writer.stop)
+
+    def __repr__(self) -> str:
+        """Return the string representation of the cache."""
+        return f"<WriteBehindCache({self.cache!r}, {len(self._writer.pending)} pending)>"
+
+    def __enter__(self) -> Self:
+        """Enter the cache context.
+
+        Returns
+        -------
+        WriteBehindCache
+            The cache itself.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Save the queued responses and stop the writer when leaving the context."""
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        """Check if the writer is stopped.
+
+        Returns
+        -------
+        bool
+            True if the cache is closed; otherwise, False.
+        """
+        return not self._finalizer.alive
+
+    def close(self):
+        """Save the queued responses and stop the writer."""
+        self._finalizer()
+
+    def has(self, request: Request) -> bool:
+        """Check if a request (and its corresponding response) is in the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to check if it's in the cache.
+
+        Returns
+        -------
+        bool
+            True if the request is queued or in the cache; otherwise, False.
+        """
+        with self._writer.pending_lock:
+            if request.id in self._writer.pending:
+                return True
+
+        with self._writer.cache_lock:
+            return self.cache.has(request)
+
+    def get(self, request: Request) -> Response | None:
+        """Get the response for the specified request from the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to get response from the cache.
+
+        Returns
+        -------
+        Response | None
+            Response from the cache or None if the request is not in the cache.
+        """
+        return self.get_many([request])[0]
+
+    def set(self, request: Request, response: Response):
+        """Queue a request and its response to be saved to the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to save to the cache.
+        response : Response
+            Response to save to the cache.
+        """
+        self.set_many([(request, response)])
+
+    def get_many(self, requests: Iterable[Request]) -> list[Response | None]:
+        """Get the responses for the specified requests from the queue or the cache.
+
+        Parameters
+        ----------
+        requests : Iterable[Request]
+            Requests to get responses from the cache.
+
+        Returns
+        -------
+        list[Response | None]
+            Response from the cache for each request, or None if it is not in the cache.
+        """
+        requests = list(requests)
+        responses: list[Response | None] = [None] * len(requests)
+
+        with self._writer.pending_lock:
+            for i, request in enumerate(requests):
+                if (pair := self._writer.pending.get(request.id)) is not None:
+                    responses[i] = pair[1]
+
+        if missing := [i for i, response in enumerate(responses) if response is None]:
+            with self._writer.cache_lock:
+                found = self.cache.get_many([requests[i] for i in missing])
+
+            for i, response in zip(missing, found, strict=True):
+                responses[i] = response
+
+        return responses
+
+    def set_many(self, pairs: Iterable[tuple[Request, Response]]):
+        """Queue requests and their responses to be saved to the cache.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[Request, Response]]
+            Requests and their responses to save to the cache.
+        """
+        if self.closed:
+            with self._writer.cache_lock:
+                self.cache.set_many(pairs)
+            return
+
+        with self._writer.pending_lock:
+            for request, response in pairs:
+                self._writer.pending[request.id] = (request, response)
+                self._writer.queue.put((request, response))
+
+    async def aset(self, request: Request, response: Response):
+        """Queue a request and its response to be saved to the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to save to the cache.
+        response : Response
+            Response to save to the cache.
+        """
+        await self.aset_many([(request, response)])
+
+    async def aset_many(self, pairs: Iterable[tuple[Request, Response]]):
+        """Queue requests and their responses to be saved to the cache.
+
+        Queueing never blocks, so it runs on the event loop.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[Request, Response]]
+            Requests and their responses to save to the cache.
+        """
+        if self.closed:
+            await self._offload(self.set_many, list(pairs))
+        else:
+            self.set_many(pairs)
+
+    def flush(self):
+        """Wait until all queued responses are saved to the cache."""
+        if self.closed:
+            return
+
+        event = threading.Event()
+        self._writer.queue.put(event)
+
+        # the writer may be stopped concurrently, which saves everything as well
+        while not event.wait(0.1) and self._writer.is_alive():
+            pass
@@ -0,0 +1,216 @@
+from collections import deque
+
+from mure.logging import Logger
+from mure.models import Response
+
+LOGGER = Logger(__name__)
+
+# status codes that indicate an overloaded or rate limiting server
+CONGESTION_STATUSES = frozenset({0, 429, 503})
+
+
+class _HostLimit:
+    """Concurrency limit of a single host."""
+
+    def __init__(self, initial: float, threshold: float, sample_size: int):
+        self.limit = initial
+        self.threshold = threshold
+        self.latencies: deque[float] = deque(maxlen=sample_size)
+        self.min_latency = float("inf")
+        self.decreased_at = float("-inf")
+        self.cooldown = 0.0
+
+
+class AdaptiveConcurrency:
+    """Adaptive concurrency limits per host using additive increase, multiplicative decrease.
+
+    Every host starts with a slow-start phase in which the limit grows by one per successful
+    response (i.e. doubles per round trip) until it reaches the threshold, and then grows by
+    one per round trip. The limit is multiplied by `backoff` if a request fails (status 0,
+    e.g. on timeouts), the server responds with 429 or 503, or the 90th latency percentile
+    exceeds `latency_tolerance` times the lowest latency observed. The limit is decreased at
+    most once per median latency, so a burst of failures only counts once.
+
+    Parameters
+    ----------
+    initial : int, optional
+        Initial concurrency limit per host, by default 1.
+    minimum : int, optional
+        Minimum concurrency limit per host, by default 1.
+    maximum : int | None, optional
+        Maximum concurrency limit per host, by default None, i.e. only `batch_size` of the
+        iterator limits the concurrency.
+    threshold : int | None, optional
+        Limit at which slow-start ends, by default None, i.e. the slow-start lasts until the
+        first decrease.
+    backoff : float, optional
+        Factor to multiply the limit with on congestion, by default 0.5.
+    latency_tolerance : float, optional
+        Tolerated ratio of the 90th latency percentile to the lowest latency, by default 2.0.
+    sample_size : int, optional
+        Number of recent latencies per host to compute percentiles from, by default 32.
+    limits : dict[str, int] | None, optional
+        Limits per host settled on in a previous run to start from, by default None.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int = 1,
+        minimum: int = 1,
+        maximum: int | None = None,
+        threshold: int | None = None,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        sample_size: int = 32,
+        limits: dict[str, int] | None = None,
+    ):
+        if not 0 < backoff < 1:
+            raise ValueError("Backoff must be between 0 and 1")
+        if not 1 <= minimum <= initial <= (maximum if maximum is not None else initial):
+            raise ValueError("Limits must satisfy 1 <= minimum <= initial <= maximum")
+
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.threshold = threshold
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.sample_size = sample_size
+
+        self._hosts: dict[str | None, _HostLimit] = {}
+        for origin, limit in (limits or {}).items():
+            # hosts with a known limit skip the slow-start
+            self._hosts[origin] = _HostLimit(limit, limit, sample_size)
+
+    def __repr__(self) -> str:
+        """Return the string representation of the adaptive concurrency."""
+        return f"<AdaptiveConcurrency({self.limits})>"
+
+    @property
+    def limits(self) -> dict[str | None, int]:
+        """Return the concurrency limits the hosts settled on.
+
+        Returns
+        -------
+        dict[str | None, int]
+            Concurrency limit per origin, e.g. to pass as `limits` for later runs.
+        """
+        return {origin: int(host.limit) for origin, host in self._hosts.items()}
+
+    def limit(self, origin: str | None) -> int:
+        """Return the current concurrency limit of a host.
+
+        Parameters
+        ----------
+        origin : str | None
+            Origin of the host.
+
+        Returns
+        -------
+        int
+            Number of requests that may be in flight for the host.
+        """
+        return int(self._host(origin).limit)
+
+    def record(
+        self,
+        origin: str | None,
+        latency: float,
+        response: Response,
+        *,
+        active: int,
+        now: float,
+    ):
+        """Adjust the concurrency limit of a host based on a finished request.
+
+        Parameters
+        ----------
+        origin : str | None
+            Origin of the host.
+        latency : float
+            Time in seconds it took to get the response.
+        response : Response
+            The server's response.
+        active : int
+            Number of requests in flight for the host, including the finished one.
+        now : float
+            Current time of a monotonic clock in seconds.
+        """
+        host = self._host(origin)
+
+        if response.status in CONGESTION_STATUSES:
+            self._decrease(origin, host, now, f"status {response.status}")
+            return
+
+        host.latencies.append(latency)
+        host.min_latency = min(host.min_latency, latency)
+
+        if len(host.latencies) >= host.latencies.maxlen // 2:
+            latencies = sorted(host.latencies)
+            if latencies[int(len(latencies) * 0.9)] > self.latency_tolerance * host.min_latency:
+                self._decrease(origin, host, now, "latency")
+                return
+
+        if active < int(host.limit):
+            # the limit was not reached, so there is no evidence that the host can handle more
+            return
+
+        if host.limit < host.threshold:
+            # slow-start: grow by one per response, i.e. double per round trip
+            host.limit += 1
+        else:
+            # congestion avoidance: grow by one per round trip
+            host.limit += 1 / host.limit
+
+        if self.maximum is not None:
+            host.limit = min(host.limit, self.maximum)
+
+    def _host(self, origin: str | None) -> _HostLimit:
+        """Get the limit of a host, initializing it on first use.
+
+        Parameters
+        ----------
+        origin : str | None
+            Origin of the host.
+
+        Returns
+        -------
+        _HostLimit
+            Concurrency limit of the host.
+        """
+        if origin not in self._hosts:
+            threshold = self.threshold if self.threshold is not None else float("inf")
+            self._hosts[origin] = _HostLimit(self.initial, threshold, self.sample_size)
+
+        return self._hosts[origin]
+
+    def _decrease(self, origin: str | None, host: _HostLimit, now: float, reason: str):
+        """Decrease the limit of a host multiplicatively.
+
+        Parameters
+        ----------
+        origin : str | None
+            Origin of the host.
+        host : _HostLimit
+            Concurrency limit of the host.
+        now : float
+            Current time of a monotonic clock in seconds.
+        reason : str
+            Reason of the decrease to log.
+        """
+        # requests that were in flight before the last decrease still see the old congestion
+        if now - host.decreased_at < host.cooldown:
+            return
+
+        host.limit = max(self.minimum, host.limit * self.backoff)
+        host.threshold = host.limit
+        host.decreased_at = now
+
+        # start over measuring latencies with the lower limit, waiting a median latency
+        # before the next decrease
+        if host.latencies:
+            host.cooldown = sorted(host.latencies)[len(host.latencies) // 2]
+            host.latencies.clear()
+
+        LOGGER.debug(f"Decreased concurrency of {origin} to {int(host.limit)} ({reason})")
@@ -1,4 +1,4 @@
-from typing import Generator
+from collections.abc import AsyncGenerator, Generator, Iterable
 
 from mure.cache import Cache
 from mure.iterator import ResponseIterator
@@ -6,192 +6,462 @@ from mure.models import Request, Resource, Response
 
 
 def delete(
-    resources: list[Resource],
+    resources: Iterable[Resource],
     *,
     batch_size: int = 5,
     cache: Cache | None = None,
-) -> Generator[Response, None, None]:
+    ordered: bool = True,
+) -> Generator[Response | tuple[int, Response], None, None]:
     """Perform a DELETE request for each resource.
 
     Parameters
     ----------
-    resources : list[Resource]
-        Resources to request.
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
     batch_size : int
         Number of items to request per batch concurrently, by default 5.
     cache : Cache | None, optional
         Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
 
     Returns
     -------
-    Generator[Response, None, None]
+    Generator[Response | tuple[int, Response], None, None]
         The server's responses for each resource.
     """
     return (
         response
         for response in ResponseIterator(
-            [Request("DELETE", **resource) for resource in resources],
+            (Request("DELETE", **resource) for resource in resources),
             batch_size=batch_size,
             cache=cache,
+            ordered=ordered,
         )
     )
 
 
 def get(
-    resources: list[Resource],
+    resources: Iterable[Resource],
     *,
     batch_size: int = 5,
     cache: Cache | None = None,
-) -> Generator[Response, None, None]:
+    ordered: bool = True,
+) -> Generator[Response | tuple[int, Response], None, None]:
     """Perform a GET request for each resource.
 
     Parameters
     ----------
-    resources : list[Resource]
-        Resources to request.
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
     batch_size : int
         Number of items to request per batch concurrently, by default 5.
     cache : Cache | None, optional
         Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
 
     Returns
     -------
-    Generator[Response, None, None]
+    Generator[Response | tuple[int, Response], None, None]
         The server's responses for each resource.
     """
     return (
         response
         for response in ResponseIterator(
-            [Request("GET", **resource) for resource in resources],
+            (Request("GET", **resource) for resource in resources),
             batch_size=batch_size,
             cache=cache,
+            ordered=ordered,
         )
     )
 
 
 def head(
-    resources: list[Resource],
+    resources: Iterable[Resource],
     *,
     batch_size: int = 5,
     cache: Cache | None = None,
-) -> Generator[Response, None, None]:
+    ordered: bool = True,
+) -> Generator[Response | tuple[int, Response], None, None]:
     """Perform a HEAD request for each resource.
 
     Parameters
     ----------
-    resources : list[Resource]
-        Resources to request.
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
     batch_size : int
         Number of items to request per batch concurrently, by default 5.
     cache : Cache | None, optional
         Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
 
     Returns
     -------
-    Generator[Response, None, None]
+    Generator[Response | tuple[int, Response], None, None]
         The server's responses for each resource.
     """
     return (
         response
         for response in ResponseIterator(
-            [Request("HEAD", **resource) for resource in resources],
+            (Request("HEAD", **resource) for resource in resources),
             batch_size=batch_size,
             cache=cache,
+            ordered=ordered,
         )
     )
 
 
 def patch(
-    resources: list[Resource],
+    resources: Iterable[Resource],
     *,
     batch_size: int = 5,
     cache: Cache | None = None,
-) -> Generator[Response, None, None]:
+    ordered: bool = True,
+) -> Generator[Response | tuple[int, Response], None, None]:
     """Perform a PATCH request for each resource.
 
     Parameters
     ----------
-    resources : list[Resource]
-        Resources to request.
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
     batch_size : int
         Number of items to request per batch concurrently, by default 5.
     cache : Cache | None, optional
         Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
 
     Returns
     -------
-    Generator[Response, None, None]
+    Generator[Response | tuple[int, Response], None, None]
         The server's responses for each resource.
     """
     return (
         response
         for response in ResponseIterator(
-            [Request("PATCH", **resource) for resource in resources],
+            (Request("PATCH", **resource) for resource in resources),
             batch_size=batch_size,
             cache=cache,
+            ordered=ordered,
         )
     )
 
 
 def post(
-    resources: list[Resource],
+    resources: Iterable[Resource],
     *,
     batch_size: int = 5,
     cache: Cache | None = None,
-) -> Generator[Response, None, None]:
+    ordered: bool = True,
+) -> Generator[Response | tuple[int, Response], None, None]:
     """Perform a POST request for each resource.
 
     Parameters
     ----------
-    resources : list[Resource]
-        Resources to request.
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
     batch_size : int
         Number of items to request per batch concurrently, by default 5.
     cache : Cache | None, optional
         Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
 
     Returns
     -------
-    Generator[Response, None, None]
+    Generator[Response | tuple[int, Response], None, None]
         The server's responses for each resource.
     """
     return (
         response
         for response in ResponseIterator(
-            [Request("POST", **resource) for resource in resources],
+            (Request("POST", **resource) for resource in resources),
             batch_size=batch_size,
             cache=cache,
+            ordered=ordered,
         )
     )
 
 
 def put(
-    resources: list[Resource],
+    resources: Iterable[Resource],
     *,
     batch_size: int = 5,
     cache: Cache | None = None,
-) -> Generator[Response, None, None]:
+    ordered: bool = True,
+) -> Generator[Response | tuple[int, Response], None, None]:
     """Perform a PUT request for each resource.
 
     Parameters
     ----------
-    resources : list[Resource]
-        Resources to request.
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
     batch_size : int
         Number of items to request per batch concurrently, by default 5.
     cache : Cache | None, optional
         Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
 
     Returns
     -------
-    Generator[Response, None, None]
+    Generator[Response | tuple[int, Response], None, None]
         The server's responses for each resource.
     """
     return (
         response
         for response in ResponseIterator(
-            [Request("PUT", **resource) for resource in resources],
+            (Request("PUT", **resource) for resource in resources),
             batch_size=batch_size,
             cache=cache,
+            ordered=ordered,
         )
     )
+
+
+async def adelete(
+    resources: Iterable[Resource],
+    *,
+    batch_size: int = 5,
+    cache: Cache | None = None,
+    ordered: bool = True,
+) -> AsyncGenerator[Response | tuple[int, Response], None]:
+    """Perform a DELETE request for each resource on the running event loop.
+
+    Parameters
+    ----------
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
+    batch_size : int
+        Number of items to request per batch concurrently, by default 5.
+    cache : Cache | None, optional
+        Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
+
+    Yields
+    ------
+    Response | tuple[int, Response]
+        The server's responses for each resource.
+    """
+    iterator = ResponseIterator(
+        (Request("DELETE", **resource) for resource in resources),
+        batch_size=batch_size,
+        cache=cache,
+        ordered=ordered,
+    )
+
+    try:
+        async for response in iterator:
+            yield response
+    finally:
+        await iterator.aclose()
+
+
+async def aget(
+    resources: Iterable[Resource],
+    *,
+    batch_size: int = 5,
+    cache: Cache | None = None,
+    ordered: bool = True,
+) -> AsyncGenerator[Response | tuple[int, Response], None]:
+    """Perform a GET request for each resource on the running event loop.
+
+    Parameters
+    ----------
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
+    batch_size : int
+        Number of items to request per batch concurrently, by default 5.
+    cache : Cache | None, optional
+        Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
+
+    Yields
+    ------
+    Response | tuple[int, Response]
+        The server's responses for each resource.
+    """
+    iterator = ResponseIterator(
+        (Request("GET", **resource) for resource in resources),
+        batch_size=batch_size,
+        cache=cache,
+        ordered=ordered,
+    )
+
+    try:
+        async for response in iterator:
+            yield response
+    finally:
+        await iterator.aclose()
+
+
+async def ahead(
+    resources: Iterable[Resource],
+    *,
+    batch_size: int = 5,
+    cache: Cache | None = None,
+    ordered: bool = True,
+) -> AsyncGenerator[Response | tuple[int, Response], None]:
+    """Perform a HEAD request for each resource on the running event loop.
+
+    Parameters
+    ----------
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
+    batch_size : int
+        Number of items to request per batch concurrently, by default 5.
+    cache : Cache | None, optional
+        Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
+
+    Yields
+    ------
+    Response | tuple[int, Response]
+        The server's responses for each resource.
+    """
+    iterator = ResponseIterator(
+        (Request("HEAD", **resource) for resource in resources),
+        batch_size=batch_size,
+        cache=cache,
+        ordered=ordered,
+    )
+
+    try:
+        async for response in iterator:
+            yield response
+    finally:
+        await iterator.aclose()
+
+
+async def apatch(
+    resources: Iterable[Resource],
+    *,
+    batch_size: int = 5,
+    cache: Cache | None = None,
+    ordered: bool = True,
+) -> AsyncGenerator[Response | tuple[int, Response], None]:
+    """Perform a PATCH request for each resource on the running event loop.
+
+    Parameters
+    ----------
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
+    batch_size : int
+        Number of items to request per batch concurrently, by default 5.
+    cache : Cache | None, optional
+        Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
+
+    Yields
+    ------
+    Response | tuple[int, Response]
+        The server's responses for each resource.
+    """
+    iterator = ResponseIterator(
+        (Request("PATCH", **resource) for resource in resources),
+        batch_size=batch_size,
+        cache=cache,
+        ordered=ordered,
+    )
+
+    try:
+        async for response in iterator:
+            yield response
+    finally:
+        await iterator.aclose()
+
+
+async def apost(
+    resources: Iterable[Resource],
+    *,
+    batch_size: int = 5,
+    cache: Cache | None = None,
+    ordered: bool = True,
+) -> AsyncGenerator[Response | tuple[int, Response], None]:
+    """Perform a POST request for each resource on the running event loop.
+
+    Parameters
+    ----------
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
+    batch_size : int
+        Number of items to request per batch concurrently, by default 5.
+    cache : Cache | None, optional
+        Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
+
+    Yields
+    ------
+    Response | tuple[int, Response]
+        The server's responses for each resource.
+    """
+    iterator = ResponseIterator(
+        (Request("POST", **resource) for resource in resources),
+        batch_size=batch_size,
+        cache=cache,
+        ordered=ordered,
+    )
+
+    try:
+        async for response in iterator:
+            yield response
+    finally:
+        await iterator.aclose()
+
+
+async def aput(
+    resources: Iterable[Resource],
+    *,
+    batch_size: int = 5,
+    cache: Cache | None = None,
+    ordered: bool = True,
+) -> AsyncGenerator[Response | tuple[int, Response], None]:
+    """Perform a PUT request for each resource on the running event loop.
+
+    Parameters
+    ----------
+    resources : Iterable[Resource]
+        Resources to request, consumed lazily.
+    batch_size : int
+        Number of items to request per batch concurrently, by default 5.
+    cache : Cache | None, optional
+        Cache to use for storing responses, by default None.
+    ordered : bool
+        If True, yield responses in the order of the resources; otherwise, yield
+        `(index, response)` pairs as soon as each response is available, by default True.
+
+    Yields
+    ------
+    Response | tuple[int, Response]
+        The server's responses for each resource.
+    """
+    iterator = ResponseIterator(
+        (Request("PUT", **resource) for resource in resources),
+        batch_size=batch_size,
+        cache=cache,
+        ordered=ordered,
+    )
+
+    try:
+        async for response in iterator:
+            yield response
+    finally:
+        await iterator.aclose()
@@ -0,0 +1,153 @@
+import codecs
+import re
+import threading
+from collections.abc import Hashable
+
+import chardet
+
+# byte order marks and their encodings (UTF-32 first, its little-endian BOM starts like UTF-16's)
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# charset declared in an HTML meta tag or an XML declaration
+DECLARATION = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)|<\?xml[^>]+encoding\s*=\s*["']([\w.:-]+)""",
+    re.IGNORECASE,
+)
+
+
+class EncodingDetector:
+    """Detector for the encoding of response bodies without a (valid) declared encoding.
+
+    The cheap and reliable signals are checked first: a byte order mark, a charset declared in
+    the document itself (HTML meta tag or XML declaration), and whether the body is valid
+    UTF-8. Only if all of them fail, the encoding is detected statistically from a prefix of
+    the body. Statistically detected encodings are memoized per key (e.g. host and content
+    type), because a server almost always uses the same encoding for the same kind of content.
+
+    Parameters
+    ----------
+    sample_size : int, optional
+        Number of bytes to detect the encoding from statistically, by default 64 KiB.
+    declaration_size : int, optional
+        Number of bytes to search for a declared charset, by default 4 KiB.
+    memo_size : int, optional
+        Maximum number of memoized encodings, by default 1024.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_size: int = 65536,
+        declaration_size: int = 4096,
+        memo_size: int = 1024,
+    ):
+        self.sample_size = sample_size
+        self.declaration_size = declaration_size
+        self.memo_size = memo_size
+
+        self._memo: dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        """Return the string representation of the encoding detector."""
+        return f"<EncodingDetector({len(self._memo)} memoized)>"
+
+    def decode(self, content: bytes, encoding: str | None, *, key: Hashable = None) -> str:
+        """Decode a response body.
+
+        Parameters
+        ----------
+        content : bytes
+            Raw response body.
+        encoding : str | None
+            Encoding declared by the server, used if it exists.
+        key : Hashable, optional
+            Key to memoize the detected encoding by, by default None, i.e. the encoding is
+            not memoized.
+
+        Returns
+        -------
+        str
+            Decoded body, invalid bytes are replaced.
+        """
+        if encoding is not None and _exists(encoding):
+            return content.decode(encoding, errors="replace")
+
+        if (encoding := self._declared(content)) is not None:
+            return content.decode(encoding, errors="replace")
+
+        try:
+            return content.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+
+        with self._lock:
+            encoding = self._memo.get(key) if key is not None else None
+
+        if encoding is None:
+            encoding = chardet.detect(content[: self.sample_size])["encoding"] or "utf-8"
+
+        if key is not None:
+            with self._lock:
+                if key not in self._memo and len(self._memo) >= self.memo_size:
+                    # forget the oldest encoding
+                    del self._memo[next(iter(self._memo))]
+                self._memo[key] = encoding
+
+        return content.decode(encoding, errors="replace")
+
+    def _declared(self, content: bytes) -> str | None:
+        """Get the encoding from a byte order mark or a declaration in the document.
+
+        Parameters
+        ----------
+        content : bytes
+            Raw response body.
+
+        Returns
+        -------
+        str | None
+            Declared encoding, or None if there is no (valid) declaration.
+        """
+        for bom, encoding in BOMS:
+            if content.startswith(bom):
+                return encoding
+
+        if match := DECLARATION.search(content, 0, self.declaration_size):
+            encoding = (match[1] or match[2]).decode("ascii")
+            if _exists(encoding):
+                return encoding
+
+        return None
+
+
+def _exists(encoding: str) -> bool:
+    """Check if an encoding is known.
+
+    Parameters
+    ----------
+    encoding : str
+        Name of the encoding.
+
+    Returns
+    -------
+    bool
+        True if Python has a text codec for the encoding; otherwise, False.
+    """
+    try:
+        codec = codecs.lookup(encoding)
+    except LookupError:
+        return False
+
+    # codecs like base64 or rot13 exist, but cannot decode bytes to text
+    return codec._is_text_encoding
+
+
+# detector shared by all responses
+DETECTOR = EncodingDetector()
@@ -0,0 +1,257 @@
+import copy
+from collections.abc import Mapping
+from datetime import UTC
+from email.utils import parsedate_to_datetime
+
+from mure.models import Freshness, Response
+
+
+class CachePolicy:
+    """Policy to keep cached responses fresh following the HTTP caching rules (RFC 9111).
+
+    The lifetime of a response is taken from `Cache-Control: max-age`, else from `Expires`,
+    else it is estimated as a fraction of the time since `Last-Modified`, else it is
+    `default_lifetime`. Stale responses are revalidated with a conditional request
+    (`If-None-Match` and `If-Modified-Since`) if they have an `ETag` or `Last-Modified`, and a
+    `304 Not Modified` refreshes the cached response instead of downloading it again.
+    Responses with `Cache-Control: no-store` and failed requests are not cached.
+
+    With `stale_while_revalidate`, stale responses are used right away instead and revalidated
+    in the background, limited to `background_limit` concurrent requests in addition to the
+    iterator's `batch_size`. Revalidations that do not fit in the iterator's window while
+    waiting for their turn are skipped. Responses with `Cache-Control: must-revalidate` are
+    never used once stale.
+
+    Parameters
+    ----------
+    default_lifetime : float, optional
+        Seconds a response without any caching headers is fresh, by default 0, i.e. it is
+        revalidated every time.
+    heuristic : float, optional
+        Fraction of the time since the last modification a response without explicit lifetime
+        is fresh, by default 0.1.
+    max_heuristic_lifetime : float, optional
+        Maximum lifetime in seconds estimated from the last modification, by default one day.
+    stale_while_revalidate : float | None, optional
+        Seconds a response may be used after it became stale while it is revalidated in the
+        background, by default None, i.e. stale responses are always revalidated first.
+    background_limit : int, optional
+        Maximum number of concurrent revalidations in the background per iterator, by default
+        2.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_lifetime: float = 0,
+        heuristic: float = 0.1,
+        max_heuristic_lifetime: float = 86400,
+        stale_while_revalidate: float | None = None,
+        background_limit: int = 2,
+    ):
+        if background_limit < 1:
+            raise ValueError("At least one background revalidation is required")
+
+        self.default_lifetime = default_lifetime
+        self.heuristic = heuristic
+        self.max_heuristic_lifetime = max_heuristic_lifetime
+        self.stale_while_revalidate = stale_while_revalidate
+        self.background_limit = background_limit
+
+    def __repr__(self) -> str:
+        """Return the string representation of the cache policy."""
+        return f"<CachePolicy(default_lifetime={self.default_lifetime})>"
+
+    def freshness(self, headers: Mapping[str, str], now: float) -> Freshness | None:
+        """Get the caching metadata of a response from its headers.
+
+        Parameters
+        ----------
+        headers : Mapping[str, str]
+            Headers of the response (with lower-case names unless case-insensitive).
+        now : float
+            Current time in seconds since the epoch.
+
+        Returns
+        -------
+        Freshness | None
+            Caching metadata, or None if the response must not be cached.
+        """
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in directives:
+            return None
+
+        # the response may have been waiting in another cache for a while already
+        try:
+            age = max(0.0, float(headers.get("age", 0)))
+        except ValueError:
+            age = 0.0
+
+        date = parse_http_date(headers.get("date")) or now
+        last_modified = headers.get("last-modified")
+
+        if "no-cache" in directives:
+            lifetime = 0.0
+        elif (max_age := directives.get("max-age")) is not None:
+            try:
+                lifetime = max(0.0, float(max_age))
+            except ValueError:
+                lifetime = 0.0
+        elif "expires" in headers:
+            # an invalid date means the response is already expired
+            expires = parse_http_date(headers["expires"])
+            lifetime = max(0.0, expires - date) if expires is not None else 0.0
+        elif (modified := parse_http_date(last_modified)) is not None:
+            lifetime = min(self.max_heuristic_lifetime, max(0.0, date - modified) * self.heuristic)
+        else:
+            lifetime = self.default_lifetime
+
+        return Freshness(
+            stored=now - age,
+            lifetime=lifetime,
+            etag=headers.get("etag"),
+            last_modified=last_modified,
+            must_revalidate="must-revalidate" in directives,
+        )
+
+    def is_fresh(self, response: Response, now: float) -> bool:
+        """Check if a cached response can be used without asking the server.
+
+        Parameters
+        ----------
+        response : Response
+            Cached response.
+        now : float
+            Current time in seconds since the epoch.
+
+        Returns
+        -------
+        bool
+            True if the response is fresh; otherwise, False.
+        """
+        freshness = response.freshness
+        return freshness is not None and now - freshness.stored < freshness.lifetime
+
+    def serves_stale(self, response: Response, now: float) -> bool:
+        """Check if a stale response can be used while it is revalidated in the background.
+
+        Parameters
+        ----------
+        response : Response
+            Stale cached response.
+        now : float
+            Current time in seconds since the epoch.
+
+        Returns
+        -------
+        bool
+            True if the response can be used; otherwise, False.
+        """
+        freshness = response.freshness
+        return (
+            self.stale_while_revalidate is not None
+            and freshness is not None
+            and not freshness.must_revalidate
+            and now - freshness.stored < freshness.lifetime + self.stale_while_revalidate
+        )
+
+    def conditional_headers(self, response: Response) -> dict[str, str]:
+        """Get the headers to revalidate a stale response with.
+
+        Parameters
+        ----------
+        response : Response
+            Stale cached response.
+
+        Returns
+        -------
+        dict[str, str]
+            `If-None-Match` and `If-Modified-Since` headers, empty if the response cannot be
+            revalidated.
+        """
+        headers = {}
+        if response.freshness is not None:
+            if response.freshness.etag is not None:
+                headers["If-None-Match"] = response.freshness.etag
+            if response.freshness.last_modified is not None:
+                headers["If-Modified-Since"] = response.freshness.last_modified
+
+        return headers
+
+    def refresh(self, stale: Response, not_modified: Response) -> Response:
+        """Refresh a stale response with the metadata of a `304 Not Modified` response.
+
+        Parameters
+        ----------
+        stale : Response
+            Stale cached response.
+        not_modified : Response
+            The server's `304 Not Modified` response.
+
+        Returns
+        -------
+        Response
+            Copy of the stale response with the updated headers and caching metadata.
+        """
+        response = copy.copy(stale)
+        response.headers = stale.headers.merge(not_modified.headers)
+        response.freshness = not_modified.freshness
+
+        # a 304 does not have to repeat the validators
+        if stale.freshness is not None and response.freshness is not None:
+            response.freshness.etag = response.freshness.etag or stale.freshness.etag
+            response.freshness.last_modified = (
+                response.freshness.last_modified or stale.freshness.last_modified
+            )
+
+        return response
+
+
+def parse_cache_control(value: str) -> dict[str, str | None]:
+    """Parse the directives of a `Cache-Control` header.
+
+    Parameters
+    ----------
+    value : str
+        Comma-separated directives, e.g. `public, max-age=3600`.
+
+    Returns
+    -------
+    dict[str, str | None]
+        Value per directive (lower-case), None for directives without value.
+    """
+    directives = {}
+    for directive in value.split(","):
+        name, _, argument = directive.partition("=")
+        if name := name.strip().lower():
+            directives[name] = argument.strip().strip('"') if argument else None
+
+    return directives
+
+
+def parse_http_date(value: str | None) -> float | None:
+    """Parse an HTTP date.
+
+    Parameters
+    ----------
+    value : str | None
+        Date, e.g. `Wed, 21 Oct 2015 07:28:00 GMT`.
+
+    Returns
+    -------
+    float | None
+        Seconds since the epoch, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    # dates without timezone are meant to be in GMT
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=UTC)
+
+    return date.timestamp()
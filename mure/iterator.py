@@ -1,53 +1,278 @@
 import asyncio
+import bisect
 import contextlib
+import itertools
 import os
-from asyncio import AbstractEventLoop, Event, Lock, PriorityQueue
-from collections.abc import AsyncGenerator, Iterator
-from typing import Self
+import threading
+import time
+from asyncio import AbstractEventLoop, Future, Semaphore, Task, TimerHandle
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator, Iterable, Iterator, Sized
+from queue import SimpleQueue
+from typing import Any, Self
 
-import chardet
 from httpx import AsyncClient
 
 from mure.cache import Cache
+from mure.concurrency import AdaptiveConcurrency
+from mure.freshness import CachePolicy
 from mure.logging import Logger
-from mure.models import Request, Response
+from mure.models import Headers, Request, Response
+from mure.ratelimit import RateLimiter
+from mure.retry import RetryPolicy
 
 LOGGER = Logger(__name__)
 
+# methods without side effects, i.e. identical requests can share a single fetch
+SAFE_METHODS = frozenset({"GET", "HEAD"})
 
-class ResponseIterator(Iterator[Response]):
-    """Response iterator that fetches responses concurrently."""
+# headers that only apply to a single connection and are not kept with a response
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailer",
+        "transfer-encoding",
+        "upgrade",
+    }
+)
+
+
+def _can_run(loop: AbstractEventLoop) -> bool:
+    """Check if an event loop can be run until a future is done.
+
+    Parameters
+    ----------
+    loop : AbstractEventLoop
+        Event loop to check.
+
+    Returns
+    -------
+    bool
+        True if neither the loop nor another loop in this thread is running; otherwise, False.
+    """
+    if loop.is_closed() or loop.is_running():
+        return False
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+
+    return False
+
+
+async def _anext(agenerator: AsyncGenerator) -> Any:
+    """Return the next item of an asynchronous generator.
+
+    Advancing the generator inside a coroutine (instead of passing `anext(agenerator)` to
+    `run_until_complete`) registers it with the running event loop, which finalizes it if
+    the generator is garbage collected before it is exhausted.
+
+    Parameters
+    ----------
+    agenerator : AsyncGenerator
+        Asynchronous generator to advance.
+
+    Returns
+    -------
+    Any
+        Next item of the generator.
+    """
+    return await anext(agenerator)
+
+
+def _coalescing_key(request: Request) -> tuple[str, frozenset[tuple[str, str]]]:
+    """Get the key of a request that identical requests share a fetch by.
+
+    The id of a request ignores its headers (unless it varies by some of them), but requests
+    with different headers, e.g. `Authorization`, may get different responses.
+
+    Parameters
+    ----------
+    request : Request
+        Request to get the key of.
+
+    Returns
+    -------
+    tuple[str, frozenset[tuple[str, str]]]
+        Id of the request and all of its headers with lower-cased names.
+    """
+    headers = request.headers or {}
+    return request.id, frozenset((name.lower(), value) for name, value in headers.items())
+
+
+class ResponseIterator(
+    Iterator[Response | tuple[int, Response]],
+    AsyncIterator[Response | tuple[int, Response]],
+):
+    """Response iterator that fetches responses concurrently.
+
+    The iterator can either be consumed synchronously, which runs the requests on a dedicated
+    event loop, or asynchronously with `async for`, which runs the requests on the running
+    event loop.
+    """
 
     def __init__(
         self,
-        requests: list[Request],
+        requests: Iterable[Request],
         *,
         batch_size: int = 5,
         cache: Cache | None = None,
+        ordered: bool = True,
+        client: AsyncClient | None = None,
+        loop: AbstractEventLoop | None = None,
+        prefetch: bool = False,
+        host_limit: int | None = None,
+        lookahead: int = 0,
+        rate_limit: RateLimiter | None = None,
+        adaptive: AdaptiveConcurrency | None = None,
+        retry: RetryPolicy | None = None,
+        coalesce: bool = True,
+        cache_policy: CachePolicy | None = None,
     ):
         """Initialize a response iterator.
 
         Parameters
         ----------
-        requests : list[Request]
-            Resources to request.
+        requests : Iterable[Request]
+            Resources to request. Any iterable is accepted and consumed lazily, i.e. requests
+            are only pulled from it when there is a free slot in the window.
         batch_size : int, optional
             Number of resources to request concurrently, by default 5.
         cache : Cache | None, optional
             Cache to use for storing responses, by default None.
+        ordered : bool, optional
+            If True, yield responses in the order of the requests; otherwise, yield
+            `(index, response)` pairs as soon as each response is available, by default True.
+        client : AsyncClient | None, optional
+            HTTP client to use, by default None, i.e. a new client is opened for the lifetime
+            of the iterator. A given client is not closed by the iterator.
+        loop : AbstractEventLoop | None, optional
+            Event loop to run the requests on, by default None, i.e. a new event loop is
+            created for the lifetime of the iterator. A given loop is not closed by the iterator.
+        prefetch : bool, optional
+            If True, run the event loop in a background thread that keeps fetching responses
+            into a buffer of `batch_size` responses while the consumer processes the previous
+            ones, by default False. Only applies if the iterator is consumed synchronously.
+        host_limit : int | None, optional
+            Maximum number of concurrent requests per host (scheme, host and port), by default
+            None, i.e. only `batch_size` limits the number of concurrent requests. If a host
+            is saturated, requests for other hosts further back in the window are started first.
+        lookahead : int, optional
+            Number of requests to take into the window in addition to `batch_size`, by default
+            0. A larger window allows to skip ahead further if hosts are saturated, at the cost
+            of buffering more responses.
+        rate_limit : RateLimiter | None, optional
+            Rate limiter to take a token from before a request is started, by default None. A
+            limiter can be shared across iterators to keep the rate across multiple calls.
+        adaptive : AdaptiveConcurrency | None, optional
+            Adaptive concurrency limits per host, adjusted based on latencies and errors, by
+            default None. `batch_size` and `host_limit` remain the upper bounds. Use its
+            `limits` after a run to see the concurrency the hosts settled on.
+        retry : RetryPolicy | None, optional
+            Policy to retry failed requests with, by default None, i.e. failed requests are
+            not retried. Requests waiting for a retry do not occupy a concurrency slot, i.e.
+            other requests in the window (see `lookahead`) are started in the meantime.
+        coalesce : bool, optional
+            If True, GET and HEAD requests with the same id and headers as a request that is
+            already in the window share its fetch instead of being sent again, by default True.
+        cache_policy : CachePolicy | None, optional
+            Policy to decide whether cached responses are fresh and to revalidate stale ones
+            with conditional requests (or use them while revalidating them in the background),
+            by default None, i.e. cached responses are used forever.
+
+        Raises
+        ------
+        ValueError
+            If prefetching is combined with a given event loop.
         """
+        if prefetch and loop is not None:
+            raise ValueError("Prefetching runs on its own event loop, a loop cannot be given")
+
         self.requests = requests
-        self.num_requests = len(requests)
-        self.pending = len(requests)
+
+        # the number of requests is only known upfront if the iterable has a length
+        self.num_requests = len(requests) if isinstance(requests, Sized) else None
+        self.pending = self.num_requests
         self.batch_size = batch_size
         self.cache = cache
+        self.ordered = ordered
+        self.client = client
+        self.loop = loop
+        self.prefetch = prefetch
+        self.host_limit = host_limit
+        self.lookahead = lookahead
+        self.rate_limit = rate_limit
+        self.adaptive = adaptive
+        self.retry = retry
+        self.coalesce = coalesce
+        self.cache_policy = cache_policy
 
         self._log_errors = bool(os.environ.get("MURE_LOG_ERRORS"))
-        self._lock = Lock()
-        self._queue = PriorityQueue()
-        self._events = [Event() for _ in requests]
-        self._tasks = {}
-        self._responses = self._fetch_responses()
+
+        # requests in the window are identified by their sequence number, i.e. their position
+        # in the window if ordered; otherwise, their index
+        self._capacity = batch_size + lookahead
+        # the window is only refilled once at least half of it is free, so that cache lookups
+        # are done in bulk
+        self._refill = max(1, self._capacity // 2)
+        # ring buffer of result slots indexed by sequence number (only used if ordered)
+        self._slots: list[Response | BaseException | None] = [None] * self._capacity
+        # completed (index, result) pairs in order of completion (only used if not ordered)
+        self._completed: deque[tuple[int, Response | BaseException]] = deque()
+        # (index, response) pairs found in the cache, which do not take a position in the window
+        self._hits: deque[tuple[int, Response]] = deque()
+
+        # index of the next response to yield and of the next request to admit
+        self._head = 0
+        self._tail = 0
+        # position of the oldest request in the window and of the next one to admit
+        self._window_head = 0
+        self._window_tail = 0
+
+        # requests in the window that have not been started yet, grouped by host (if limited)
+        self._per_host = (
+            host_limit is not None
+            or adaptive is not None
+            or (rate_limit is not None and rate_limit.per_host)
+        )
+        # entries are (sequence number, request, attempts so far, deadline)
+        self._waiting: dict[str | None, deque[tuple[int, Request, int, float | None]]] = {}
+        # timer to start waiting requests once the rate limit allows it
+        self._timer: TimerHandle | None = None
+        # responses to save to the cache once a window of them is fetched, keyed by request id
+        # (they are used like cached responses until they are saved)
+        self._writes: dict[str, tuple[Request, Response]] = {}
+
+        # sequence numbers of duplicates waiting for the fetch of a request, keyed by its id and
+        # headers (see `_coalescing_key`)
+        self._followers: dict[tuple[str, frozenset[tuple[str, str]]], list[int]] = {}
+        # timers to put requests back into the window after their backoff
+        self._backoffs: dict[int, TimerHandle] = {}
+        # stale cached responses to revalidate, keyed by sequence number
+        self._stale: dict[int, Response] = {}
+        # stale responses that were used already and are revalidated in the background, the
+        # ids of all of them (waiting or running) and the running revalidations
+        self._revalidations: deque[tuple[Request, Response]] = deque()
+        self._revalidating: set[str] = set()
+        self._background: set[Task] = set()
+
+        # number of requests in flight, overall and per host
+        self._active = 0
+        self._active_per_host: dict[str | None, int] = {}
+
+        # strong references to running tasks, at most one per slot in the window
+        self._tasks: set[Task] = set()
+        self._session: AsyncClient | None = None
+        self._waiter: Future | None = None
+        self._exhausted = False
+        self._closing = False
+        self._responses = self._prefetch_responses() if prefetch else self._fetch_responses()
+        self._aresponses: AsyncGenerator[Response | tuple[int, Response], None] | None = None
 
     def __repr__(self) -> str:
         """Response iterator representation.
@@ -57,16 +282,27 @@ class ResponseIterator(Iterator[Response]):
         str
             Representation with number of pending requests.
         """
+        if self.num_requests is None:
+            return "<ResponseIterator: unknown number pending>"
+
         return f"<ResponseIterator: {self.pending}/{self.num_requests} pending>"
 
-    def __len__(self) -> int | float:
+    def __len__(self) -> int:
         """Return the number of pending responses.
 
         Returns
         -------
         int
             Absolute number of pending responses.
+
+        Raises
+        ------
+        TypeError
+            If the requests were passed as an iterable without length.
         """
+        if self.pending is None:
+            raise TypeError("Number of pending responses is unknown for lazy iterables")
+
         return self.pending
 
     def __iter__(self) -> Self:
@@ -74,174 +310,765 @@ class ResponseIterator(Iterator[Response]):
 
         Yields
         ------
-        Iterator[Response]
+        Iterator[Response | tuple[int, Response]]
             Response iterator.
         """
         return self
 
-    def __next__(self) -> Response:
+    def __next__(self) -> Response | tuple[int, Response]:
         """Return the next response.
 
         Returns
         -------
-        Response
-            Next response.
+        Response | tuple[int, Response]
+            Next response, or the index of the request and its response if not ordered.
         """
         return next(self._responses)
 
-    def _fetch_responses(self) -> Iterator[Response]:
+    def __aiter__(self) -> Self:
+        """Yield one response at a time on the running event loop.
+
+        Returns
+        -------
+        AsyncIterator[Response | tuple[int, Response]]
+            Asynchronous response iterator.
+        """
+        return self
+
+    async def __anext__(self) -> Response | tuple[int, Response]:
+        """Return the next response.
+
+        Returns
+        -------
+        Response | tuple[int, Response]
+            Next response, or the index of the request and its response if not ordered.
+        """
+        if self._aresponses is None:
+            self._aresponses = self._afetch_responses()
+
+        return await anext(self._aresponses)
+
+    def __enter__(self) -> Self:
+        """Enter the iterator context.
+
+        Returns
+        -------
+        ResponseIterator
+            The iterator itself.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Close the iterator when leaving the context."""
+        self.close()
+
+    async def __aenter__(self) -> Self:
+        """Enter the iterator context.
+
+        Returns
+        -------
+        ResponseIterator
+            The iterator itself.
+        """
+        return self
+
+    async def __aexit__(self, *args):
+        """Close the iterator when leaving the context."""
+        await self.aclose()
+
+    def close(self):
+        """Cancel outstanding requests of a synchronously consumed iterator.
+
+        Closes the client and event loop of the iterator (unless they were given). An iterator
+        that is garbage collected before it is exhausted cannot wait for its requests to be
+        cancelled, so iterators that may be left early should be closed explicitly.
+        """
+        self._closing = True
+        self._responses.close()
+
+    async def aclose(self):
+        """Cancel outstanding requests of an asynchronously consumed iterator."""
+        if self._aresponses is not None:
+            await self._aresponses.aclose()
+
+    def _abandon(self, loop: AbstractEventLoop):
+        """Release the requests of an abandoned iterator without running its event loop.
+
+        Parameters
+        ----------
+        loop : AbstractEventLoop
+            Event loop the requests were started on.
+        """
+        tasks = self._tasks | self._background
+
+        if self.loop is not None and not loop.is_closed():
+            # the given loop keeps running, so the tasks are cancelled the next time it runs
+            for timer in [self._timer, *self._backoffs.values()]:
+                if timer is not None:
+                    timer.cancel()
+            for task in tasks:
+                task.cancel()
+            return
+
+        for task in tasks:
+            # the tasks never run again, close their coroutines so that they are not reported
+            # as never awaited once they are garbage collected
+            with contextlib.suppress(RuntimeError):
+                task.get_coro().close()
+
+    def _fetch_responses(self) -> Iterator[Response | tuple[int, Response]]:
         """Fetch responses concurrently.
 
         Yields
         ------
-        Response
+        Response | tuple[int, Response]
+            One response at a time.
+        """
+        if self.loop is not None:
+            loop = self.loop
+        else:
+            # get new event loop that is used for all operations
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+
+        agenerator = self._afetch_responses()
+
+        try:
+            # run the event loop until a response is available and yield it
+            while True:
+                try:
+                    yield loop.run_until_complete(_anext(agenerator))
+                except StopAsyncIteration:
+                    break
+        finally:
+            if self._closing and _can_run(loop):
+                # cancel outstanding requests if the iterator is closed early
+                loop.run_until_complete(agenerator.aclose())
+            elif agenerator.ag_frame is not None:
+                # the iterator was garbage collected (possibly while another event loop runs in
+                # this thread), so release what is left without running the loop
+                self._abandon(loop)
+
+            if self.loop is None:
+                # close the event loop and remove it from the current context (unless the
+                # iterator is finalized while another loop is running)
+                idle = _can_run(loop)
+                loop.close()
+                if idle:
+                    asyncio.set_event_loop(None)
+
+    def _prefetch_responses(self) -> Iterator[Response | tuple[int, Response]]:
+        """Fetch responses concurrently in a background thread.
+
+        Yields
+        ------
+        Response | tuple[int, Response]
             One response at a time.
         """
-        # get new event loop that is used for all operations
         loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
 
-        agenerator = self._agenerator_wrapper(loop)
+        # the buffer is bounded by the semaphore, which is released whenever a response is taken
+        buffer = SimpleQueue()
+        space = Semaphore(self.batch_size)
 
-        # run the event loop until a response is available and yield it
-        while True:
-            try:
-                yield loop.run_until_complete(anext(agenerator))
-            except StopAsyncIteration:
+        task = loop.create_task(self._aprefetch_responses(buffer, space))
+
+        def run():
+            # the task is cancelled if the iterator is closed early
+            with contextlib.suppress(asyncio.CancelledError):
+                loop.run_until_complete(task)
+
+        thread = threading.Thread(target=run, name="mure-prefetch", daemon=True)
+        thread.start()
+
+        try:
+            while (item := buffer.get()) is not None:
+                response, error = item
+                if error is not None:
+                    raise error
+
+                loop.call_soon_threadsafe(space.release)
+                yield response
+        finally:
+            # cancel outstanding requests if the iterator is closed early
+            loop.call_soon_threadsafe(task.cancel)
+            thread.join()
+            loop.close()
+
+    async def _aprefetch_responses(self, buffer: SimpleQueue, space: Semaphore):
+        """Fetch responses and put them into the buffer as long as there is space left.
+
+        Parameters
+        ----------
+        buffer : SimpleQueue
+            Buffer of `(response, error)` pairs, terminated by None.
+        space : Semaphore
+            Semaphore counting the free slots in the buffer.
+        """
+        responses = self._afetch_responses()
+        try:
+            while True:
+                # wait for space before advancing the window, which schedules the next request
+                await space.acquire()
+                try:
+                    response = await anext(responses)
+                except StopAsyncIteration:
+                    break
+
+                buffer.put((response, None))
+        except Exception as error:
+            buffer.put((None, error))
+        finally:
+            await responses.aclose()
+            buffer.put(None)
+
+    async def _aadmit(self):
+        """Take requests into the window until it is full or there are no requests left.
+
+        Requests are looked up in the cache in chunks of at least half the window. Responses
+        found in the cache are ready to be yielded right away and do not take a position in
+        the window, only the other requests wait for a concurrency slot.
+        """
+        # save fetched responses once per window, and once all requests are done
+        if len(self._writes) >= self._capacity or (
+            self._exhausted and self._window_head == self._window_tail
+        ):
+            await self._asave()
+
+        while not self._exhausted and len(self._hits) < self._capacity:
+            # the window spans from the oldest request not yielded yet to the next to admit
+            free = self._capacity - (self._window_tail - self._window_head)
+            if free < self._refill:
                 break
 
-        # close the event loop and remove it from the current context
-        loop.close()
-        asyncio.set_event_loop(None)
+            requests = list(itertools.islice(self._requests, free))
+            if len(requests) < free:
+                self._exhausted = True
+
+            now = time.time()
+            for request, response in zip(requests, await self._alookup(requests), strict=True):
+                self._admit(request, response, now)
+
+        self._dispatch()
 
-    def _schedule_tasks(self, session: AsyncClient, loop: AbstractEventLoop):
-        """Schedule tasks for fetching responses concurrently.
+    def _admit(self, request: Request, response: Response | None, now: float):
+        """Take a request into the window, unless its response is in the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request to admit.
+        response : Response | None
+            Cached response of the request, or None if it is not in the cache.
+        now : float
+            Current time in seconds since the epoch.
+        """
+        stale = None
+        if (
+            response is not None
+            and self.cache_policy is not None
+            and not self.cache_policy.is_fresh(response, now)
+        ):
+            stale, response = response, None
+
+            if self.cache_policy.serves_stale(stale, now):
+                # use the stale response right away and revalidate it in the background
+                self._revalidate_later(request, stale)
+                stale, response = None, stale
+
+        if response is not None:
+            LOGGER.debug(f"Used response {self._tail} from cache")
+            self._hits.append((self._tail, response))
+            self._tail += 1
+            return
+
+        priority = self._window_tail if self.ordered else self._tail
+        self._window_tail += 1
+        self._tail += 1
+
+        if self.coalesce and request.method in SAFE_METHODS:
+            key = _coalescing_key(request)
+            if (followers := self._followers.get(key)) is not None:
+                # an identical request is already in the window, wait for its response
+                LOGGER.debug(f"Coalesced {priority} with pending request")
+                followers.append(priority)
+                return
+
+            self._followers[key] = []
+
+        if stale is not None:
+            # ask the server whether the cached response is still valid
+            self._stale[priority] = stale
+
+        origin = request.origin if self._per_host else None
+        self._waiting.setdefault(origin, deque()).append((priority, request, 0, None))
+
+    async def _alookup(self, requests: list[Request]) -> list[Response | None]:
+        """Look up the responses of requests in the cache.
+
+        Responses that are not saved to the cache yet are used as well.
+
+        Parameters
+        ----------
+        requests : list[Request]
+            Requests to look up.
+
+        Returns
+        -------
+        list[Response | None]
+            Cached response for each request, or None if it is not in the cache.
+        """
+        if self.cache is None:
+            return [None] * len(requests)
+
+        responses = await self.cache.aget_many(requests)
+
+        # responses waiting to be saved are newer than the ones in the cache
+        return [
+            pending[1] if (pending := self._writes.get(request.id)) is not None else response
+            for request, response in zip(requests, responses, strict=True)
+        ]
+
+    async def _asave(self):
+        """Save the fetched responses to the cache in bulk."""
+        if not self._writes:
+            return
+
+        pairs = list(self._writes.values())
+        await self.cache.aset_many(pairs)
+        LOGGER.debug(f"Saved {len(pairs)} responses in cache")
+
+        for request, response in pairs:
+            # keep responses that were fetched again in the meantime
+            if self._writes.get(request.id, (None, None))[1] is response:
+                del self._writes[request.id]
+
+    def _dispatch(self):
+        """Start waiting requests as long as the concurrency limits allow it."""
+        loop = asyncio.get_running_loop()
+
+        while self._active < self.batch_size and self._waiting:
+            startable, origin = self._select(loop)
+            if not startable:
+                return
+
+            queue = self._waiting[origin]
+            priority, request, attempt, deadline = queue.popleft()
+            if not queue:
+                del self._waiting[origin]
+
+            self._active += 1
+            self._active_per_host[origin] = self._active_per_host.get(origin, 0) + 1
+
+            task = loop.create_task(
+                self._aprocess_request(priority, request, origin, attempt, deadline)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _select(self, loop: AbstractEventLoop) -> tuple[bool, str | None]:
+        """Select the host of the next request to start.
+
+        Skips ahead to the oldest waiting request of a host that is neither saturated nor
+        rate limited. If all hosts are rate limited, a timer is set to try again as soon as the
+        first token is available.
 
         Parameters
         ----------
-        session : AsyncClient
-            HTTP session to use.
         loop : AbstractEventLoop
             Event loop to use.
+
+        Returns
+        -------
+        tuple[bool, str | None]
+            True and the origin if a request can be started; otherwise, False and None.
         """
-        for priority, request in enumerate(self.requests):
-            coroutine = self._aprocess_request(
-                session,
-                priority,
-                request,
-                self._events[priority],
-            )
+        delay = None
+        for _, origin in sorted((queue[0][0], origin) for origin, queue in self._waiting.items()):
+            if self._active_per_host.get(origin, 0) >= self._host_limit(origin):
+                continue
 
-            self._tasks[priority] = loop.create_task(coroutine)
-            yield
+            if self.rate_limit is None:
+                return True, origin
 
-    async def _aprocess_request(
+            if not (wait := self.rate_limit.acquire(origin, loop.time())):
+                return True, origin
+
+            delay = wait if delay is None else min(delay, wait)
+
+        if delay is not None and (self._timer is None or self._timer.when() > loop.time() + delay):
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = loop.call_later(delay, self._dispatch_later)
+
+        return False, None
+
+    def _host_limit(self, origin: str | None) -> int | float:
+        """Return the current concurrency limit of a host.
+
+        Parameters
+        ----------
+        origin : str | None
+            Origin of the host.
+
+        Returns
+        -------
+        int | float
+            Number of requests that may be in flight for the host.
+        """
+        limit = self.host_limit if self.host_limit is not None else float("inf")
+        if self.adaptive is not None:
+            limit = min(limit, self.adaptive.limit(origin))
+
+        return limit
+
+    def _dispatch_later(self):
+        """Start waiting requests after the rate limit timer fired."""
+        self._timer = None
+        self._dispatch()
+
+    def _retry_later(
         self,
-        session: AsyncClient,
+        delay: float,
         priority: int,
         request: Request,
-        event: Event,
+        origin: str | None,
+        attempt: int,
+        deadline: float | None,
     ):
-        """Process a request by fetching and putting it in the queue.
+        """Put a request back into the window after a delay.
 
         Parameters
         ----------
-        session : AsyncClient
-            HTTP session to use.
+        delay : float
+            Seconds to wait before the request is started again.
         priority : int
-            Priority of the request.
-        request. : Request
+            Sequence number of the request.
+        request : Request
             Resource to request.
-        event : Event
-            Event to set when the response is ready.
+        origin : str | None
+            Origin of the request, or None if hosts are not limited.
+        attempt : int
+            Number of attempts made so far.
+        deadline : float | None
+            Time of the event loop after which the request is not retried anymore.
         """
-        LOGGER.debug(f"Started {priority}")
+        LOGGER.debug(f"Retrying {priority} in {delay:.2f}s (attempt {attempt})")
 
-        # if cache is given and has response for the request, use it
-        if self.cache and self.cache.has(request):
-            LOGGER.debug(f"Found response {priority} in cache")
-            async with self._lock:
-                response = self.cache.get(request)
-            LOGGER.debug(f"Used response {priority} from cache")
-        else:
-            response = await self._asend_request(session, request)
+        def requeue():
+            del self._backoffs[priority]
 
-            # save response to cache
-            if self.cache:
-                LOGGER.debug(f"Saving response {priority} in cache")
-                async with self._lock:
-                    self.cache.set(request, response)
-                LOGGER.debug(f"Saved response {priority} in cache")
+            # keep the queue sorted so that the oldest request is started first
+            queue = self._waiting.setdefault(origin, deque())
+            bisect.insort(
+                queue, (priority, request, attempt, deadline), key=lambda entry: entry[0]
+            )
+            self._dispatch()
 
-        # put response in the queue
-        await self._queue.put((priority, response))
+        self._backoffs[priority] = asyncio.get_running_loop().call_later(delay, requeue)
 
-        # set event to notify that the response is ready
-        event.set()
+    def _revalidate_later(self, request: Request, stale: Response):
+        """Revalidate a stale response in the background once the budget allows it.
 
-        LOGGER.debug(f"Finished {priority}")
+        At most as many revalidations as fit in the window wait for their turn, others are
+        skipped.
 
-    async def _agenerator_wrapper(self, loop: AbstractEventLoop) -> AsyncGenerator[Response, None]:
-        """Wrap the response generator.
+        Parameters
+        ----------
+        request : Request
+            Request of the stale response.
+        stale : Response
+            Stale cached response that was used already.
+        """
+        # without a bound, a long run of stale hits would keep all of them (and their stale
+        # responses) waiting, so revalidations that do not fit in the queue are skipped and
+        # the responses stay stale in the cache until they are used the next time
+        if request.id in self._revalidating or len(self._revalidations) >= self._capacity:
+            return
+
+        self._revalidating.add(request.id)
+        self._revalidations.append((request, stale))
+        self._dispatch_revalidations()
+
+    def _dispatch_revalidations(self, task: Task | None = None):
+        """Start waiting revalidations as long as the background budget allows it.
 
         Parameters
         ----------
-        loop : AbstractEventLoop
-            Event loop to use.
+        task : Task | None, optional
+            Finished revalidation that frees its slot, by default None.
+        """
+        if task is not None:
+            self._background.discard(task)
 
-        Yields
-        ------
-        Response
-            The server's response.
+        loop = asyncio.get_running_loop()
+        while self._revalidations and len(self._background) < self.cache_policy.background_limit:
+            task = loop.create_task(self._arevalidate(*self._revalidations.popleft()))
+            self._background.add(task)
+            task.add_done_callback(self._dispatch_revalidations)
+
+    async def _arevalidate(self, request: Request, stale: Response):
+        """Revalidate a stale response and save the result to the cache.
+
+        Parameters
+        ----------
+        request : Request
+            Request of the stale response.
+        stale : Response
+            Stale cached response.
         """
-        async for response in self._afetch_responses(loop):
-            yield response
+        try:
+            response, _ = await self._asend_request(
+                self._session, request, timeout=request.timeout, stale=stale
+            )
 
-    async def _afetch_responses(self, loop: AbstractEventLoop) -> AsyncGenerator[Response, None]:
-        """Fetch responses concurrently.
+            if response.status == 304:
+                response = self.cache_policy.refresh(stale, response)
+
+            LOGGER.debug(f"Revalidated {request} in the background ({response.status})")
+
+            # failed revalidations keep the stale response in the cache
+            if response.freshness is not None:
+                self._writes[request.id] = (request, response)
+        finally:
+            self._revalidating.discard(request.id)
+
+    def _release(self, origin: str | None):
+        """Release the concurrency slot of a finished request and start the next one.
 
         Parameters
         ----------
-        loop : AbstractEventLoop
-            Event loop to use.
+        origin : str | None
+            Origin of the finished request, or None if hosts are not limited.
+        """
+        self._active -= 1
+        self._active_per_host[origin] -= 1
+        if not self._active_per_host[origin]:
+            del self._active_per_host[origin]
+
+        self._dispatch()
+
+    def _complete(self, priority: int, result: Response | BaseException):
+        """Store the result of a request and wake up the consumer if it waits for it.
+
+        Parameters
+        ----------
+        priority : int
+            Sequence number of the request.
+        result : Response | BaseException
+            The server's response or the error that occurred while processing the request.
+        """
+        if self.ordered:
+            self._slots[priority % self._capacity] = result
+            if priority != self._window_head:
+                # the consumer only waits for the head of the window
+                return
+        else:
+            self._completed.append((priority, result))
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _finish(self, priority: int, request: Request, result: Response | BaseException):
+        """Complete a request and all of its coalesced duplicates.
+
+        Parameters
+        ----------
+        priority : int
+            Sequence number of the request.
+        request : Request
+            The finished request.
+        result : Response | BaseException
+            The server's response or the error that occurred while processing the request.
+        """
+        self._complete(priority, result)
+
+        if self.coalesce and request.method in SAFE_METHODS:
+            for follower in self._followers.pop(_coalescing_key(request)):
+                self._complete(follower, result)
+
+    async def _await_completion(self):
+        """Wait until the next result is available."""
+        self._waiter = asyncio.get_running_loop().create_future()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+
+    async def _aprocess_request(
+        self,
+        priority: int,
+        request: Request,
+        origin: str | None,
+        attempt: int,
+        deadline: float | None,
+    ):
+        """Process a request by fetching it and storing its response in the window.
+
+        Parameters
+        ----------
+        priority : int
+            Sequence number of the request.
+        request : Request
+            Resource to request.
+        origin : str | None
+            Origin of the request, or None if hosts are not limited.
+        attempt : int
+            Number of attempts made so far.
+        deadline : float | None
+            Time of the event loop after which the request is not retried anymore.
+        """
+        LOGGER.debug(f"Started {priority}")
+        loop = asyncio.get_running_loop()
+
+        try:
+            started = loop.time()
+            attempt += 1
+
+            timeout = request.timeout
+            if self.retry is not None and self.retry.deadline is not None:
+                # the deadline starts with the first attempt and limits all of them
+                deadline = deadline if deadline is not None else started + self.retry.deadline
+                timeout = min(timeout or float("inf"), max(0.0, deadline - started))
+
+            response, delay = await self._asend_request(
+                self._session,
+                request,
+                attempt=attempt,
+                timeout=timeout,
+                stale=self._stale.get(priority),
+            )
+
+            if self.adaptive is not None:
+                finished = loop.time()
+                self.adaptive.record(
+                    origin,
+                    finished - started,
+                    response,
+                    active=self._active_per_host[origin],
+                    now=finished,
+                )
+
+            if delay is not None and (deadline is None or loop.time() + delay < deadline):
+                # free the slot while waiting for the retry
+                self._release(origin)
+                self._retry_later(delay, priority, request, origin, attempt, deadline)
+                return
+
+            stale = self._stale.pop(priority, None)
+            if stale is not None and response.status == 304:
+                LOGGER.debug(f"Revalidated {priority}")
+                response = self.cache_policy.refresh(stale, response)
+
+            response.attempts = attempt
+
+            # save response to cache (in bulk once a window of responses is fetched), unless
+            # the cache policy forbids it
+            if self.cache is not None and (
+                self.cache_policy is None or response.freshness is not None
+            ):
+                self._writes[request.id] = (request, response)
+        except Exception as error:
+            # hand the error over to the consumer instead of losing it in the task
+            self._stale.pop(priority, None)
+            self._release(origin)
+            self._finish(priority, request, error)
+        else:
+            self._release(origin)
+            self._finish(priority, request, response)
+
+        LOGGER.debug(f"Finished {priority}")
+
+    async def _afetch_responses(self) -> AsyncGenerator[Response | tuple[int, Response], None]:
+        """Fetch responses concurrently.
 
         Yields
         ------
-        Response
-            The server's response.
+        Response | tuple[int, Response]
+            The server's response, or the index of the request and its response if not ordered.
         """
-        try:
-            async with AsyncClient(follow_redirects=True, http2=True) as session:
-                # schedule tasks for fetching responses concurrently
-                tasks = self._schedule_tasks(session, loop)
-                while len(self._tasks) < self.batch_size:
-                    try:
-                        next(tasks)
-                    except StopIteration:
-                        break
-
-                for event in self._events:
-                    # wait for the specific event to be set to preserve order of the requests
-                    await event.wait()
-
-                    # get response from the queue
-                    priority, response = await self._queue.get()
-                    self._queue.task_done()
-
-                    # get rid of the task that has been completed
-                    self._tasks.pop(priority)
-
-                    LOGGER.debug(f"Yielding {priority}")
-                    yield response
-                    self.pending -= 1
-
-                    with contextlib.suppress(StopIteration):
-                        # schedule next task (if any left)
-                        next(tasks)
-        except GeneratorExit:
-            return
+        self._requests = iter(self.requests)
+
+        # use the given client or open a new one for the lifetime of the iterator
+        if self.client is not None:
+            context = contextlib.nullcontext(self.client)
+        else:
+            context = AsyncClient(follow_redirects=True, http2=True)
+
+        async with context as self._session:
+            try:
+                await self._aadmit()
+
+                while self._head < self._tail:
+                    if self._hits and (not self.ordered or self._hits[0][0] == self._head):
+                        # responses from the cache are yielded as soon as it is their turn
+                        index, result = self._hits.popleft()
+                    else:
+                        if self.ordered:
+                            # wait for the head of the window to preserve order of the requests
+                            slot = self._window_head % self._capacity
+                            while (result := self._slots[slot]) is None:
+                                await self._await_completion()
+
+                            self._slots[slot] = None
+                            index = self._head
+                        else:
+                            # take whichever response is available first, regardless of its
+                            # position
+                            while not self._completed:
+                                await self._await_completion()
+
+                            index, result = self._completed.popleft()
+
+                        self._window_head += 1
 
-    async def _asend_request(self, session: AsyncClient, request: Request) -> Response:
+                    self._head += 1
+
+                    # admit the next request (if any left) before handing out the response
+                    await self._aadmit()
+
+                    if isinstance(result, BaseException):
+                        raise result
+
+                    LOGGER.debug(f"Yielding {index}")
+                    yield result if self.ordered else (index, result)
+
+                    if self.pending is not None:
+                        self.pending -= 1
+
+                # finish the running revalidations before the iterator is exhausted, but skip
+                # the ones that did not start yet instead of making the consumer wait for them
+                self._revalidations.clear()
+                while self._background:
+                    await asyncio.wait(set(self._background))
+            finally:
+                # cancel requests that are still in flight if the consumer stops early
+                self._waiting.clear()
+                self._stale.clear()
+                self._revalidations.clear()
+                if self._timer is not None:
+                    self._timer.cancel()
+                for timer in self._backoffs.values():
+                    timer.cancel()
+                for task in self._tasks | self._background:
+                    task.cancel()
+                await asyncio.gather(*self._tasks, *self._background, return_exceptions=True)
+
+                # save the fetched responses only after all requests are done, so that a failing
+                # cache does not leave them running
+                await self._asave()
+                if self.cache is not None:
+                    await self.cache.aflush()
+
+    async def _asend_request(
+        self,
+        session: AsyncClient,
+        request: Request,
+        *,
+        attempt: int = 1,
+        timeout: float | None = None,
+        stale: Response | None = None,
+    ) -> tuple[Response, float | None]:
         """Perform a HTTP request.
 
         Parameters
@@ -250,45 +1077,72 @@ class ResponseIterator(Iterator[Response]):
             HTTP session to use.
         request : Resource
             Resource to request.
+        attempt : int, optional
+            Number of the attempt, by default 1.
+        timeout : float | None, optional
+            Timeout of the attempt in seconds, by default None.
+        stale : Response | None, optional
+            Stale cached response to revalidate with a conditional request, by default None.
 
         Returns
         -------
-        Response
-            The server's response.
+        tuple[Response, float | None]
+            The server's response and the seconds to wait before retrying the request, or None
+            if it is not retried.
         """
+        headers = request.headers
+        if stale is not None:
+            headers = {**(headers or {}), **self.cache_policy.conditional_headers(stale)}
+
         try:
             LOGGER.debug("Sending request")
             response = await session.request(
                 request.method,
                 request.url,
-                headers=request.headers,
+                headers=headers,
                 params=request.params,
                 data=request.data,
                 json=request.json,
-                timeout=request.timeout,
+                timeout=timeout,
             )
 
+            # the body is only decoded if the text of the response is accessed
             content = await response.aread()
 
-            try:
-                text = content.decode(response.encoding or "utf-8", errors="replace")
-            except (LookupError, TypeError):
-                # LookupError is raised if the encoding was not found which could
-                # indicate a misspelling or similar mistake
-                #
-                # TypeError can be raised if encoding is None
-                encoding = chardet.detect(content)["encoding"]
-                text = content.decode(encoding or "utf-8", errors="replace")
+            delay = None
+            if self.retry is not None:
+                delay = self.retry.delay(
+                    request.method,
+                    attempt,
+                    status=response.status_code,
+                    headers=response.headers,
+                )
+
+            freshness = None
+            if self.cache_policy is not None:
+                freshness = self.cache_policy.freshness(response.headers, time.time())
 
             return Response(
                 status=response.status_code,
                 reason=response.reason_phrase,
                 ok=response.is_success,
-                text=text,
+                content=content,
+                encoding=response.charset_encoding,
+                headers=Headers(
+                    (name, value)
+                    for name, value in response.headers.multi_items()
+                    if name not in HOP_BY_HOP_HEADERS
+                ),
+                http_version=response.http_version,
                 url=str(response.url),
-            )
+                freshness=freshness,
+            ), delay
         except Exception as error:
             if self._log_errors:
                 LOGGER.error(error)
 
-            return Response(status=0, reason=repr(error), ok=False, text="", url="")
+            delay = None
+            if self.retry is not None:
+                delay = self.retry.delay(request.method, attempt, error=error)
+
+            return Response(status=0, reason=repr(error), ok=False, text="", url=""), delay
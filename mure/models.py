@@ -1,11 +1,26 @@
 import json
-from functools import cached_property
+import re
+import sys
+from collections.abc import Collection, Iterable, Iterator, Mapping
 from hashlib import blake2b
-from typing import Any, Literal, Mapping, NotRequired, TypedDict
+from operator import itemgetter
+from typing import Any, Literal, NotRequired, Self, TypedDict
+from urllib.parse import quote_plus, unquote_plus, urlsplit
+
+from mure.encoding import DETECTOR
 
 # supported http methods
 Method = Literal["DELETE", "GET", "HEAD", "PATCH", "POST", "PUT"]
 
+# default ports of the supported url schemes
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# characters of url parameters that are never percent-encoded
+UNRESERVED = re.compile(r"[\w.~-]*", re.ASCII)
+
+# queries that only consist of unreserved characters (i.e. are encoded canonically already)
+UNRESERVED_QUERY = re.compile(r"[\w.~=&-]*", re.ASCII)
+
 # json serializable types
 Serializable = dict | list | str | int | float | bool | None
 
@@ -19,6 +34,7 @@ class Resource(TypedDict):
     data: NotRequired[Serializable]
     json: NotRequired[Serializable]
     timeout: NotRequired[int | None]
+    vary: NotRequired[Collection[str] | None]
 
 
 class Request:
@@ -40,8 +56,14 @@ class Request:
         JSON request body, by default None.
     timeout : int | None, optional
         Request timeout in seconds, by default 10.
+    vary : Collection[str] | None, optional
+        Names of request headers that are part of the identifier, like the ones a `Vary`
+        response header lists, by default None, i.e. headers are ignored.
     """
 
+    # millions of requests can be queued, slots keep them small
+    __slots__ = ("_id", "data", "headers", "json", "method", "params", "timeout", "url", "vary")
+
     def __init__(
         self,
         method: Method,
@@ -52,6 +74,7 @@ class Request:
         data: Any | None = None,
         json: Any | None = None,
         timeout: int | None = 10,
+        vary: Collection[str] | None = None,
     ):
         self.method = method
         self.url = url
@@ -60,34 +83,369 @@ class Request:
         self.data = data
         self.json = json
         self.timeout = timeout
+        self.vary = vary
+        self._id: str | None = None
 
     def __repr__(self) -> str:
         """Return the string representation of the request."""
         return f"<Request({self.method}, {self.url})>"
 
-    @cached_property
+    @property
+    def origin(self) -> str:
+        """Return the origin (scheme, host and port) of the request.
+
+        Returns
+        -------
+        str
+            Origin of the request, e.g. `https://httpbin.org:443`.
+        """
+        parts = urlsplit(self.url)
+
+        try:
+            port = parts.port or DEFAULT_PORTS.get(parts.scheme)
+        except ValueError:
+            # port is not a number or out of range
+            port = None
+
+        return f"{parts.scheme}://{parts.hostname or ''}:{port or ''}"
+
+    @property
     def id(self) -> str:
-        """Return the unique identifier of the request.
+        """Return the unique identifier of the request, computed on first access.
+
+        The identifier is the same for requests that only differ in the case of the scheme
+        and host, an explicit default port, the order of URL parameters, or whether the
+        parameters are part of the URL or passed as `params`.
+
+        Returns
+        -------
+        str
+            Unique identifier of the request.
+        """
+        if self._id is None:
+            self._id = self._hash()
+
+        return self._id
+
+    def _hash(self) -> str:
+        """Hash the request to its unique identifier.
 
         Returns
         -------
         str
             Unique identifier of the request.
         """
-        components: list[str] = [
-            self.method,
-            self.url,
-            json.dumps(self.params, sort_keys=True),
-            json.dumps(self.json, sort_keys=True),
-            json.dumps(self.data, sort_keys=True),
-        ]
+        # optional components are tagged and only the (raw) body, which may contain line
+        # breaks, comes last, so that different requests cannot be joined to the same key
+        components = [self.method, canonical_url(self.url, self.params)]
+
+        if self.vary:
+            headers = {name.lower(): value for name, value in (self.headers or {}).items()}
+            for name in sorted({name.lower() for name in self.vary}):
+                if (value := headers.get(name)) is not None:
+                    components.append(f"header:{name}:{value}")
+
+        if self.json is not None:
+            components.append("json:" + json.dumps(self.json, sort_keys=True))
+
+        if isinstance(self.data, bytes):
+            components.append("data:" + self.data.decode("latin-1"))
+        elif isinstance(self.data, str):
+            components.append("data:" + self.data)
+        elif self.data is not None:
+            components.append("form:" + json.dumps(self.data, sort_keys=True))
 
         # hash the components to generate a unique identifier
-        key = blake2b(digest_size=16)
-        for component in components:
-            key.update(component.encode("utf-8"))
+        key = "\n".join(components).encode("utf-8", errors="surrogatepass")
+        return blake2b(key, digest_size=16).hexdigest()
+
+
+def canonical_url(url: str, params: Mapping[str, Any] | None = None) -> str:
+    """Get the normalized form of a URL, e.g. to identify requests by.
+
+    The scheme and host are lower-cased, default ports and the fragment are removed, and the
+    parameters are merged into the query, which is sorted by parameter name (repeated
+    parameters keep their order).
+
+    Parameters
+    ----------
+    url : str
+        URL to normalize.
+    params : Mapping[str, Any] | None, optional
+        URL parameters to add to the query, by default None. Sequences are repeated
+        parameters, like `httpx` sends them.
+
+    Returns
+    -------
+    str
+        Normalized URL, e.g. `https://httpbin.org/get?a=1&b=2`.
+    """
+    scheme, netloc, path, query, _ = urlsplit(url)
+    scheme = scheme.lower()
+
+    # the user name and password are case-sensitive, the host and port are not
+    userinfo, at, host = netloc.rpartition("@")
+    host = host.lower().removesuffix(f":{DEFAULT_PORTS.get(scheme)}")
 
-        return key.hexdigest()
+    if params or query:
+        pairs: list[tuple[str, str | None]] = []
+        requote = UNRESERVED_QUERY.fullmatch(query) is None
+        for pair in query.split("&"):
+            if pair:
+                # a parameter without value (`?flag`) is kept apart from an empty one (`?flag=`)
+                name, equals, value = pair.partition("=")
+                if requote:
+                    name, value = _requote(name), _requote(value)
+                pairs.append((name, value if equals else None))
+
+        for name, value in (params or {}).items():
+            name = _quote(name)
+            if isinstance(value, list | tuple):
+                pairs.extend((name, _quote(_param(item))) for item in value)
+            else:
+                pairs.append((name, _quote(_param(value))))
+
+        # a stable sort keeps the order of repeated parameters
+        pairs.sort(key=itemgetter(0))
+        query = "?" + "&".join(
+            [name if value is None else f"{name}={value}" for name, value in pairs]
+        )
+
+    return f"{scheme}://{userinfo}{at}{host}{path or '/'}{query}"
+
+
+def _quote(value: str) -> str:
+    """Percent-encode a URL parameter name or value.
+
+    Parameters
+    ----------
+    value : str
+        Name or value as is.
+
+    Returns
+    -------
+    str
+        Encoded name or value, spaces are encoded as `+`.
+    """
+    return value if UNRESERVED.fullmatch(value) else quote_plus(value)
+
+
+def _requote(value: str) -> str:
+    """Percent-encode an already encoded URL parameter name or value canonically.
+
+    Parameters
+    ----------
+    value : str
+        Name or value as in the query of a URL.
+
+    Returns
+    -------
+    str
+        Encoded name or value, e.g. `%7E` becomes `~` and `%20` becomes `+`.
+    """
+    return value if UNRESERVED.fullmatch(value) else quote_plus(unquote_plus(value))
+
+
+def _param(value: Any) -> str:
+    """Convert a URL parameter to a string the way `httpx` does.
+
+    Parameters
+    ----------
+    value : Any
+        Value of the parameter.
+
+    Returns
+    -------
+    str
+        `true` and `false` for booleans, an empty string for None, else the value as string.
+    """
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if value is None:
+        return ""
+
+    return str(value)
+
+
+class Headers(Mapping[str, str]):
+    """Immutable, case-insensitive multi-dict of HTTP headers.
+
+    The headers are stored as a single tuple of `(name, value)` pairs with lower-case names
+    that are interned, i.e. every name is only kept once in memory across all responses.
+    Multiple values of a header are joined with commas when looked up by name, use
+    `get_list` to get them separately.
+
+    Parameters
+    ----------
+    items : Iterable[tuple[str, str]], optional
+        Header names and values, by default no headers.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: Iterable[tuple[str, str]] = ()):
+        self._items = tuple((sys.intern(name.lower()), value) for name, value in items)
+
+    def __repr__(self) -> str:
+        """Return the string representation of the headers."""
+        return f"<Headers({list(self._items)})>"
+
+    def __reduce__(self) -> tuple[type, tuple[tuple[tuple[str, str], ...]]]:
+        """Pickle the headers as a tuple of pairs.
+
+        Returns
+        -------
+        tuple[type, tuple[tuple[tuple[str, str], ...]]]
+            Class and its arguments.
+        """
+        return Headers, (self._items,)
+
+    def __getitem__(self, name: str) -> str:
+        """Return the value(s) of a header.
+
+        Parameters
+        ----------
+        name : str
+            Name of the header (case-insensitive).
+
+        Returns
+        -------
+        str
+            Value of the header, multiple values joined with commas.
+
+        Raises
+        ------
+        KeyError
+            If there is no such header.
+        """
+        if not (values := self.get_list(name)):
+            raise KeyError(name)
+
+        return ", ".join(values)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the (lower-case) names of the headers.
+
+        Returns
+        -------
+        Iterator[str]
+            Every name once, in order of appearance.
+        """
+        return iter(dict.fromkeys(name for name, _ in self._items))
+
+    def __len__(self) -> int:
+        """Return the number of distinct header names."""
+        return len(set(name for name, _ in self._items))
+
+    @classmethod
+    def of(cls, headers: Mapping[str, str] | None) -> Self:
+        """Get headers from a mapping, reusing immutable headers as they are.
+
+        Parameters
+        ----------
+        headers : Mapping[str, str] | None
+            Headers to convert.
+
+        Returns
+        -------
+        Headers
+            Immutable headers, the shared empty headers if there are none.
+        """
+        if isinstance(headers, Headers):
+            return headers
+        if not headers:
+            return EMPTY_HEADERS
+
+        return cls(headers.items())
+
+    def get_list(self, name: str) -> list[str]:
+        """Return all values of a header.
+
+        Parameters
+        ----------
+        name : str
+            Name of the header (case-insensitive).
+
+        Returns
+        -------
+        list[str]
+            Values of the header, empty if there is no such header.
+        """
+        name = name.lower()
+        return [value for key, value in self._items if key == name]
+
+    def multi_items(self) -> tuple[tuple[str, str], ...]:
+        """Return all header names and values, including repeated headers.
+
+        Returns
+        -------
+        tuple[tuple[str, str], ...]
+            Header names (lower-case) and values, in order of appearance.
+        """
+        return self._items
+
+    def merge(self, other: Mapping[str, str]) -> Self:
+        """Get headers updated with other headers, e.g. the ones of a `304 Not Modified`.
+
+        Parameters
+        ----------
+        other : Mapping[str, str]
+            Headers that replace all values of headers with the same name.
+
+        Returns
+        -------
+        Headers
+            Merged headers.
+        """
+        other = Headers.of(other)
+        if not other:
+            return self
+
+        kept = [(name, value) for name, value in self._items if name not in other]
+        return Headers(kept + list(other.multi_items()))
+
+
+# headers shared by all responses without headers
+EMPTY_HEADERS = Headers()
+
+
+class Freshness:
+    """Caching metadata of a response.
+
+    Parameters
+    ----------
+    stored : float
+        Time (seconds since the epoch) at which the response was generated by the server.
+    lifetime : float
+        Seconds the response is fresh after it was generated.
+    etag : str | None, optional
+        Value of the `ETag` header, by default None.
+    last_modified : str | None, optional
+        Value of the `Last-Modified` header, by default None.
+    must_revalidate : bool, optional
+        True if the response must not be used once it is stale, by default False.
+    """
+
+    def __init__(
+        self,
+        *,
+        stored: float,
+        lifetime: float,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        must_revalidate: bool = False,
+    ):
+        self.stored = stored
+        self.lifetime = lifetime
+        self.etag = etag
+        self.last_modified = last_modified
+        self.must_revalidate = must_revalidate
+
+    def __repr__(self) -> str:
+        """Return the string representation of the caching metadata."""
+        return f"<Freshness({self.lifetime}s, etag={self.etag})>"
 
 
 class Response:
@@ -103,10 +461,38 @@ class Response:
         HTTP status reason.
     url : str
         URL of the response.
-    text : str
-        Response body.
+    text : str | None, optional
+        Decoded response body, by default None, i.e. it is decoded from `content` on first
+        access.
+    content : bytes | None, optional
+        Raw response body, by default None, i.e. it is encoded from `text` as UTF-8.
+    encoding : str | None, optional
+        Encoding of `content` declared by the server, by default None, i.e. it is detected.
+    headers : Mapping[str, str] | None, optional
+        Response headers, by default None, i.e. no headers.
+    http_version : str | None, optional
+        HTTP version of the response, e.g. `HTTP/2`, by default None.
+    attempts : int, optional
+        Number of attempts it took to get the response, by default 1.
+    freshness : Freshness | None, optional
+        Caching metadata, by default None, i.e. only set if a `CachePolicy` is used.
     """
 
+    # cached responses are retained in memory, slots keep them small
+    __slots__ = (
+        "_text",
+        "attempts",
+        "content",
+        "encoding",
+        "freshness",
+        "headers",
+        "http_version",
+        "ok",
+        "reason",
+        "status",
+        "url",
+    )
+
     def __init__(
         self,
         *,
@@ -114,18 +500,99 @@ class Response:
         status: int,
         reason: str | None,
         url: str,
-        text: str,
+        text: str | None = None,
+        content: bytes | None = None,
+        encoding: str | None = None,
+        headers: Mapping[str, str] | None = None,
+        http_version: str | None = None,
+        attempts: int = 1,
+        freshness: Freshness | None = None,
     ):
+        if content is None:
+            content = (text or "").encode("utf-8")
+            encoding = "utf-8"
+
         self.ok = ok
         self.status = status
         self.reason = reason
         self.url = url
-        self.text = text
+        self.content = content
+        self.encoding = encoding
+        self.headers = Headers.of(headers)
+        self.http_version = http_version
+        self.attempts = attempts
+        self.freshness = freshness
+        self._text = text
 
     def __repr__(self) -> str:
         """Return the string representation of the response."""
         return f"<Response({self.status}, {self.reason})>"
 
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the state to pickle, without the decoded body.
+
+        Returns
+        -------
+        dict[str, Any]
+            Attributes of the response.
+        """
+        return {name: getattr(self, name) for name in self.__slots__ if name != "_text"}
+
+    def __setstate__(self, state: dict[str, Any]):
+        """Restore the response from a pickled state.
+
+        Responses pickled by older versions (e.g. in a `DiskCache`) may lack attributes or
+        only have the decoded body, those get the defaults of the constructor.
+
+        Parameters
+        ----------
+        state : dict[str, Any]
+            Attributes of the response.
+        """
+        self.__init__(
+            ok=state["ok"],
+            status=state["status"],
+            reason=state["reason"],
+            url=state["url"],
+            text=state.get("text"),
+            content=state.get("content"),
+            encoding=state.get("encoding"),
+            headers=state.get("headers"),
+            http_version=state.get("http_version"),
+            attempts=state.get("attempts", 1),
+            freshness=state.get("freshness"),
+        )
+
+    @property
+    def content_type(self) -> str | None:
+        """Return the value of the `Content-Type` header.
+
+        Returns
+        -------
+        str | None
+            Content type of the body, or None if the header is missing.
+        """
+        return self.headers.get("content-type")
+
+    @property
+    def text(self) -> str:
+        """Return the decoded response body, decoded on first access.
+
+        Returns
+        -------
+        str
+            Body decoded with the declared encoding, or with the detected encoding if the
+            server did not declare a valid one. Invalid bytes are replaced.
+        """
+        if self._text is None:
+            # the same host usually serves the same kind of content in the same encoding
+            media_type = (self.content_type or "").partition(";")[0].strip().lower()
+            key = (urlsplit(self.url).hostname, media_type)
+
+            self._text = DETECTOR.decode(self.content, self.encoding, key=key)
+
+        return self._text
+
     def json(self) -> Any:
         """Parse the response body as JSON.
 
@@ -0,0 +1,159 @@
+from collections.abc import Mapping
+from fnmatch import fnmatch
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Token bucket that refills continuously at a fixed rate.
+
+    Parameters
+    ----------
+    rate : float
+        Number of tokens added per second.
+    burst : int, optional
+        Maximum number of tokens, i.e. requests that can be sent at once, by default 1.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate must be positive and burst at least 1")
+
+        self.rate = rate
+        self.burst = burst
+
+        # the bucket starts full
+        self._tokens = float(burst)
+        self._updated: float | None = None
+
+    def __repr__(self) -> str:
+        """Return the string representation of the token bucket."""
+        return f"<TokenBucket({self.rate}/s, burst={self.burst})>"
+
+    def wait(self, now: float) -> float:
+        """Return the time until a token is available.
+
+        Parameters
+        ----------
+        now : float
+            Current time of a monotonic clock in seconds.
+
+        Returns
+        -------
+        float
+            Seconds until a token is available, 0.0 if there is one right now.
+        """
+        if self._updated is not None:
+            elapsed = now - self._updated
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self):
+        """Take a token from the bucket (must be available, see `wait`)."""
+        self._tokens -= 1
+
+
+class RateLimiter:
+    """Rate limiter with a global token bucket and token buckets per host.
+
+    Parameters
+    ----------
+    rate : float | None, optional
+        Maximum number of requests per second overall, by default None, i.e. unlimited.
+    burst : int, optional
+        Number of requests that can be sent at once overall, by default 1.
+    hosts : Mapping[str, tuple[float, int]] | None, optional
+        Maximum number of requests per second and burst per host, by default None. Keys are
+        host names or shell-style patterns (e.g. `*.example.org`); the first matching pattern
+        applies and every host matching it gets its own bucket.
+
+    Examples
+    --------
+    >>> limiter = RateLimiter(100, burst=10, hosts={"api.example.org": (5, 1)})
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        *,
+        burst: int = 1,
+        hosts: Mapping[str, tuple[float, int]] | None = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.hosts = dict(hosts or {})
+
+        self._bucket = TokenBucket(rate, burst) if rate is not None else None
+        self._buckets: dict[str, TokenBucket | None] = {}
+
+    def __repr__(self) -> str:
+        """Return the string representation of the rate limiter."""
+        return f"<RateLimiter({self.rate}/s, burst={self.burst}, hosts={self.hosts})>"
+
+    @property
+    def per_host(self) -> bool:
+        """Check if requests are limited per host.
+
+        Returns
+        -------
+        bool
+            True if there are limits per host; otherwise, False.
+        """
+        return bool(self.hosts)
+
+    def acquire(self, origin: str | None, now: float) -> float:
+        """Take a token for a request to the specified origin if available.
+
+        Parameters
+        ----------
+        origin : str | None
+            Origin of the request, or None to only check the global limit.
+        now : float
+            Current time of a monotonic clock in seconds.
+
+        Returns
+        -------
+        float
+            0.0 if the request may be sent right now; otherwise, the seconds to wait.
+        """
+        buckets = [self._bucket, self._host_bucket(origin)]
+        buckets = [bucket for bucket in buckets if bucket is not None]
+
+        # only take tokens if all buckets have one, i.e. a request is never counted twice
+        if delay := max((bucket.wait(now) for bucket in buckets), default=0.0):
+            return delay
+
+        for bucket in buckets:
+            bucket.take()
+
+        return 0.0
+
+    def _host_bucket(self, origin: str | None) -> TokenBucket | None:
+        """Get the token bucket for the specified origin.
+
+        Parameters
+        ----------
+        origin : str | None
+            Origin of the request.
+
+        Returns
+        -------
+        TokenBucket | None
+            Token bucket of the origin, or None if the origin's host is not limited.
+        """
+        if origin is None or not self.hosts:
+            return None
+
+        if origin not in self._buckets:
+            host = urlsplit(origin).hostname or ""
+            self._buckets[origin] = next(
+                (
+                    TokenBucket(rate, burst)
+                    for pattern, (rate, burst) in self.hosts.items()
+                    if fnmatch(host, pattern)
+                ),
+                None,
+            )
+
+        return self._buckets[origin]
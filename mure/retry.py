@@ -0,0 +1,155 @@
+import random
+from collections.abc import Collection, Mapping
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from mure.models import Method
+
+# status codes that indicate a temporary problem of the server
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# errors that indicate a temporary problem of the network or the server
+RETRY_EXCEPTIONS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+# methods that can be repeated without side effects
+IDEMPOTENT_METHODS = frozenset({"DELETE", "GET", "HEAD", "PUT"})
+
+
+class RetryPolicy:
+    """Policy to retry failed requests with exponential backoff.
+
+    The delay before the n-th retry is drawn uniformly from zero up to
+    `min(max_backoff, backoff * 2 ** (n - 1))` ("full jitter"), or is exactly that value if
+    jitter is disabled. A `Retry-After` header of the response takes precedence if it asks
+    to wait longer.
+
+    Parameters
+    ----------
+    attempts : int, optional
+        Maximum number of attempts per request (including the first one), by default 3.
+    statuses : Collection[int], optional
+        Status codes to retry, by default 408, 425, 429, 500, 502, 503 and 504.
+    exceptions : tuple[type[Exception], ...], optional
+        Errors to retry, by default timeouts, network errors and protocol errors.
+    methods : Collection[Method], optional
+        HTTP methods to retry, by default only idempotent ones (DELETE, GET, HEAD, PUT).
+    backoff : float, optional
+        Base delay in seconds, by default 0.5.
+    max_backoff : float, optional
+        Maximum delay in seconds, by default 30.
+    jitter : bool, optional
+        If True, randomize the delay to spread retries of many requests, by default True.
+    respect_retry_after : bool, optional
+        If True, wait at least as long as the `Retry-After` header asks to, by default True.
+    deadline : float | None, optional
+        Maximum time in seconds from the first attempt of a request to its last, by default
+        None. A request is not retried if its delay would exceed the deadline, and the timeout
+        of an attempt is cut to the time left.
+    """
+
+    def __init__(
+        self,
+        *,
+        attempts: int = 3,
+        statuses: Collection[int] = RETRY_STATUSES,
+        exceptions: tuple[type[Exception], ...] = RETRY_EXCEPTIONS,
+        methods: Collection[Method] = IDEMPOTENT_METHODS,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        jitter: bool = True,
+        respect_retry_after: bool = True,
+        deadline: float | None = None,
+    ):
+        if attempts < 1:
+            raise ValueError("At least one attempt is required")
+
+        self.attempts = attempts
+        self.statuses = frozenset(statuses)
+        self.exceptions = exceptions
+        self.methods = frozenset(methods)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.respect_retry_after = respect_retry_after
+        self.deadline = deadline
+
+    def __repr__(self) -> str:
+        """Return the string representation of the retry policy."""
+        return f"<RetryPolicy(attempts={self.attempts}, backoff={self.backoff})>"
+
+    def delay(
+        self,
+        method: Method,
+        attempt: int,
+        *,
+        status: int | None = None,
+        headers: Mapping[str, str] | None = None,
+        error: Exception | None = None,
+    ) -> float | None:
+        """Return the time to wait before retrying a request.
+
+        Parameters
+        ----------
+        method : Method
+            HTTP method of the request.
+        attempt : int
+            Number of attempts made so far.
+        status : int | None, optional
+            Status code of the response, by default None.
+        headers : Mapping[str, str] | None, optional
+            Headers of the response, by default None.
+        error : Exception | None, optional
+            Error raised while sending the request, by default None.
+
+        Returns
+        -------
+        float | None
+            Seconds to wait before the next attempt, or None if the request is not retried.
+        """
+        if attempt >= self.attempts or method not in self.methods:
+            return None
+
+        if error is not None:
+            if not isinstance(error, self.exceptions):
+                return None
+        elif status not in self.statuses:
+            return None
+
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        if self.respect_retry_after and headers and "retry-after" in headers:
+            delay = max(delay, parse_retry_after(headers["retry-after"]))
+
+        return delay
+
+
+def parse_retry_after(value: str) -> float:
+    """Parse the value of a `Retry-After` header.
+
+    Parameters
+    ----------
+    value : str
+        Either a number of seconds or an HTTP date.
+
+    Returns
+    -------
+    float
+        Seconds to wait, 0.0 if the value is invalid or in the past.
+    """
+    if value.strip().isdigit():
+        return float(value)
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+    # dates without timezone are meant to be in GMT
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=UTC)
+
+    return max(0.0, (date - datetime.now(UTC)).total_seconds())
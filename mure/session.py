@@ -0,0 +1,293 @@
+import asyncio
+import weakref
+from collections.abc import Generator, Iterable
+from typing import Self
+
+from httpx import AsyncClient
+
+from mure.cache import Cache
+from mure.iterator import ResponseIterator
+from mure.logging import Logger
+from mure.models import Method, Request, Resource, Response
+
+LOGGER = Logger(__name__)
+
+
+class Session:
+    """Session that reuses its event loop and HTTP connections across calls.
+
+    The request functions of a session behave like the module-level functions, e.g.
+    `mure.get`, but share a long-lived event loop and `AsyncClient`, i.e. keep-alive
+    connections (and their DNS lookups and TLS handshakes) are reused across calls. A session
+    is not thread-safe and should be closed once it is no longer needed, preferably by using
+    it as context manager.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._client = AsyncClient(follow_redirects=True, http2=True)
+        # iterators of the session that are still referenced, closed with the session
+        self._iterators: weakref.WeakSet[ResponseIterator] = weakref.WeakSet()
+
+    def __repr__(self) -> str:
+        """Return the string representation of the session."""
+        return f"<Session({'closed' if self.closed else 'open'})>"
+
+    def __enter__(self) -> Self:
+        """Enter the session context.
+
+        Returns
+        -------
+        Session
+            The session itself.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """Close the session when leaving the context."""
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        """Check if the session is closed.
+
+        Returns
+        -------
+        bool
+            True if the session is closed; otherwise, False.
+        """
+        return self._loop.is_closed()
+
+    def close(self):
+        """Close unfinished iterators, the HTTP client and the event loop."""
+        if self.closed:
+            return
+
+        for iterator in list(self._iterators):
+            iterator.close()
+
+        self._loop.run_until_complete(self._client.aclose())
+        self._loop.close()
+        LOGGER.debug("Closed session")
+
+    def delete(
+        self,
+        resources: Iterable[Resource],
+        *,
+        batch_size: int = 5,
+        cache: Cache | None = None,
+        ordered: bool = True,
+    ) -> Generator[Response | tuple[int, Response], None, None]:
+        """Perform a DELETE request for each resource.
+
+        Parameters
+        ----------
+        resources : Iterable[Resource]
+            Resources to request, consumed lazily.
+        batch_size : int
+            Number of items to request per batch concurrently, by default 5.
+        cache : Cache | None, optional
+            Cache to use for storing responses, by default None.
+        ordered : bool
+            If True, yield responses in the order of the resources; otherwise, yield
+            `(index, response)` pairs as soon as each response is available, by default True.
+
+        Returns
+        -------
+        Generator[Response | tuple[int, Response], None, None]
+            The server's responses for each resource.
+        """
+        return self._request("DELETE", resources, batch_size, cache, ordered)
+
+    def get(
+        self,
+        resources: Iterable[Resource],
+        *,
+        batch_size: int = 5,
+        cache: Cache | None = None,
+        ordered: bool = True,
+    ) -> Generator[Response | tuple[int, Response], None, None]:
+        """Perform a GET request for each resource.
+
+        Parameters
+        ----------
+        resources : Iterable[Resource]
+            Resources to request, consumed lazily.
+        batch_size : int
+            Number of items to request per batch concurrently, by default 5.
+        cache : Cache | None, optional
+            Cache to use for storing responses, by default None.
+        ordered : bool
+            If True, yield responses in the order of the resources; otherwise, yield
+            `(index, response)` pairs as soon as each response is available, by default True.
+
+        Returns
+        -------
+        Generator[Response | tuple[int, Response], None, None]
+            The server's responses for each resource.
+        """
+        return self._request("GET", resources, batch_size, cache, ordered)
+
+    def head(
+        self,
+        resources: Iterable[Resource],
+        *,
+        batch_size: int = 5,
+        cache: Cache | None = None,
+        ordered: bool = True,
+    ) -> Generator[Response | tuple[int, Response], None, None]:
+        """Perform a HEAD request for each resource.
+
+        Parameters
+        ----------
+        resources : Iterable[Resource]
+            Resources to request, consumed lazily.
+        batch_size : int
+            Number of items to request per batch concurrently, by default 5.
+        cache : Cache | None, optional
+            Cache to use for storing responses, by default None.
+        ordered : bool
+            If True, yield responses in the order of the resources; otherwise, yield
+            `(index, response)` pairs as soon as each response is available, by default True.
+
+        Returns
+        -------
+        Generator[Response | tuple[int, Response], None, None]
+            The server's responses for each resource.
+        """
+        return self._request("HEAD", resources, batch_size, cache, ordered)
+
+    def patch(
+        self,
+        resources: Iterable[Resource],
+        *,
+        batch_size: int = 5,
+        cache: Cache | None = None,
+        ordered: bool = True,
+    ) -> Generator[Response | tuple[int, Response], None, None]:
+        """Perform a PATCH request for each resource.
+
+        Parameters
+        ----------
+        resources : Iterable[Resource]
+            Resources to request, consumed lazily.
+        batch_size : int
+            Number of items to request per batch concurrently, by default 5.
+        cache : Cache | None, optional
+            Cache to use for storing responses, by default None.
+        ordered : bool
+            If True, yield responses in the order of the resources; otherwise, yield
+            `(index, response)` pairs as soon as each response is available, by default True.
+
+        Returns
+        -------
+        Generator[Response | tuple[int, Response], None, None]
+            The server's responses for each resource.
+        """
+        return self._request("PATCH", resources, batch_size, cache, ordered)
+
+    def post(
+        self,
+        resources: Iterable[Resource],
+        *,
+        batch_size: int = 5,
+        cache: Cache | None = None,
+        ordered: bool = True,
+    ) -> Generator[Response | tuple[int, Response], None, None]:
+        """Perform a POST request for each resource.
+
+        Parameters
+        ----------
+        resources : Iterable[Resource]
+            Resources to request, consumed lazily.
+        batch_size : int
+            Number of items to request per batch concurrently, by default 5.
+        cache : Cache | None, optional
+            Cache to use for storing responses, by default None.
+        ordered : bool
+            If True, yield responses in the order of the resources; otherwise, yield
+            `(index, response)` pairs as soon as each response is available, by default True.
+
+        Returns
+        -------
+        Generator[Response | tuple[int, Response], None, None]
+            The server's responses for each resource.
+        """
+        return self._request("POST", resources, batch_size, cache, ordered)
+
+    def put(
+        self,
+        resources: Iterable[Resource],
+        *,
+        batch_size: int = 5,
+        cache: Cache | None = None,
+        ordered: bool = True,
+    ) -> Generator[Response | tuple[int, Response], None, None]:
+        """Perform a PUT request for each resource.
+
+        Parameters
+        ----------
+        resources : Iterable[Resource]
+            Resources to request, consumed lazily.
+        batch_size : int
+            Number of items to request per batch concurrently, by default 5.
+        cache : Cache | None, optional
+            Cache to use for storing responses, by default None.
+        ordered : bool
+            If True, yield responses in the order of the resources; otherwise, yield
+            `(index, response)` pairs as soon as each response is available, by default True.
+
+        Returns
+        -------
+        Generator[Response | tuple[int, Response], None, None]
+            The server's responses for each resource.
+        """
+        return self._request("PUT", resources, batch_size, cache, ordered)
+
+    def _request(
+        self,
+        method: Method,
+        resources: Iterable[Resource],
+        batch_size: int,
+        cache: Cache | None,
+        ordered: bool,  # noqa: FBT001
+    ) -> Generator[Response | tuple[int, Response], None, None]:
+        """Perform a request for each resource on the session's event loop and client.
+
+        Parameters
+        ----------
+        method : Method
+            HTTP method.
+        resources : Iterable[Resource]
+            Resources to request, consumed lazily.
+        batch_size : int
+            Number of items to request per batch concurrently.
+        cache : Cache | None
+            Cache to use for storing responses.
+        ordered : bool
+            If True, yield responses in the order of the resources.
+
+        Returns
+        -------
+        Generator[Response | tuple[int, Response], None, None]
+            The server's responses for each resource.
+
+        Raises
+        ------
+        RuntimeError
+            If the session is already closed.
+        """
+        if self.closed:
+            raise RuntimeError("Session is closed")
+
+        iterator = ResponseIterator(
+            (Request(method, **resource) for resource in resources),
+            batch_size=batch_size,
+            cache=cache,
+            ordered=ordered,
+            client=self._client,
+            loop=self._loop,
+        )
+        self._iterators.add(iterator)
+
+        return (response for response in iterator)
@@ -1,7 +1,22 @@
+import asyncio
+import gc
+import multiprocessing
+import threading
+import time
+from collections.abc import Iterable
 from pathlib import Path
 
-from mure.cache import DiskCache, MemoryCache
-from mure.models import Request, Response
+import pytest
+
+from mure.cache import (
+    Cache,
+    DiskCache,
+    MemoryCache,
+    SQLiteCache,
+    TieredCache,
+    WriteBehindCache,
+)
+from mure.models import Freshness, Headers, Request, Response
 
 
 def test_memory_cache():
@@ -18,6 +33,76 @@ def test_memory_cache():
     assert cache.get(request) == response
 
 
+def test_memory_cache_eviction():
+    requests = [Request("GET", f"https://httpbin.org/get?id={i}") for i in range(4)]
+    responses = [
+        Response(ok=True, status=200, reason="OK", url=request.url, text=str(i) * 10)
+        for i, request in enumerate(requests)
+    ]
+
+    cache = MemoryCache(max_entries=2)
+    cache.set(requests[0], responses[0])
+    cache.set(requests[1], responses[1])
+
+    # the first response was used recently, so the second one is evicted
+    assert cache.get(requests[0]) is responses[0]
+    cache.set(requests[2], responses[2])
+
+    assert cache.get_many(requests) == [responses[0], None, responses[2], None]
+    assert (len(cache), cache.hits, cache.misses, cache.evictions) == (2, 3, 2, 1)
+
+    # bodies are accounted by their size in bytes
+    cache = MemoryCache(max_bytes=20)
+    for request, response in zip(requests, responses, strict=True):
+        cache.set(request, response)
+
+    assert cache.get_many(requests) == [None, None, responses[2], responses[3]]
+    assert cache.size == cache.max_bytes
+
+    # a response that would never fit is not cached at all
+    cache.set(requests[0], Response(ok=True, status=200, reason="OK", url="", text="0" * 100))
+    assert not cache.has(requests[0])
+    assert len(cache) == 2
+
+
+def test_memory_cache_ttl():
+    request = Request("GET", "https://httpbin.org/get")
+    response = Response(ok=True, status=200, reason="OK", url="https://httpbin.org/get", text="")
+
+    cache = MemoryCache(ttl=0)
+    cache.set(request, response)
+    assert cache.get(request) is None
+    assert cache.size == 0
+
+    cache = MemoryCache(ttl=60)
+    cache.set(request, response)
+    assert cache.get(request) is response
+
+
+def test_memory_cache_lifetime():
+    requests = [Request("GET", f"https://httpbin.org/get?id={i}") for i in range(4)]
+    lifetimes = (
+        Freshness(stored=time.time(), lifetime=60),
+        Freshness(stored=time.time() - 100, lifetime=10),
+        Freshness(stored=time.time() - 100, lifetime=10, etag='"v1"'),
+        Freshness(stored=time.time(), lifetime=3600),
+    )
+
+    cache = MemoryCache(ttl=600)
+    for request, freshness in zip(requests, lifetimes, strict=True):
+        cache.set(
+            request,
+            Response(ok=True, status=200, reason="OK", url="", text="", freshness=freshness),
+        )
+
+    # every response expires with its own lifetime (capped by the ttl), except stale ones that
+    # can still be revalidated
+    assert [cache.has(request) for request in requests] == [True, False, True, True]
+    assert [expires for _, _, expires in cache._cache.values()] == [
+        pytest.approx(time.monotonic() + ttl, abs=1) for ttl in (60, 600, 600)
+    ]
+
+
 def test_disk_cache(tmp_path: Path):
     path = tmp_path / "mure-cache.shelve"
 
@@ -38,3 +123,290 @@ def test_disk_cache(tmp_path: Path):
 
     # may not be empty
     assert path.stat().st_size > 0
+
+
+def test_disk_cache_threads(tmp_path: Path):
+    cache = DiskCache(tmp_path / "mure-cache.shelve")
+    request = Request("GET", "https://httpbin.org/get")
+    response = Response(ok=True, status=200, reason="OK", url="https://httpbin.org/get", text="")
+
+    # the shelf is used from the event loop, the cache's thread and other threads
+    asyncio.run(cache.aset_many([(request, response)]))
+    assert [cached.url for cached in asyncio.run(cache.aget_many([request]))] == [response.url]
+
+    found = []
+    thread = threading.Thread(target=lambda: found.append(cache.get(request)))
+    thread.start()
+    thread.join()
+
+    assert [cached.url for cached in found] == [response.url]
+
+    write_behind = WriteBehindCache(cache)
+    write_behind.set(request, response)
+    write_behind.close()
+
+    assert cache.has(request)
+
+
+def test_bulk(tmp_path: Path):
+    requests = [Request("GET", f"https://httpbin.org/get?id={i}") for i in range(3)]
+    responses = [
+        Response(ok=True, status=200, reason="OK", url=request.url, text=str(i))
+        for i, request in enumerate(requests)
+    ]
+
+    for cache in (
+        MemoryCache(),
+        DiskCache(tmp_path / "mure-cache.shelve"),
+        SQLiteCache(tmp_path / "mure-cache.sqlite"),
+    ):
+        assert cache.get_many(requests) == [None, None, None]
+
+        cache.set_many(zip(requests[:2], responses[:2], strict=True))
+
+        cached = cache.get_many(requests)
+        assert [response.text for response in cached[:2]] == ["0", "1"]
+        assert cached[2] is None
+
+
+def fields(response: Response) -> tuple:
+    return response.ok, response.status, response.reason, response.url, response.text
+
+
+def test_sqlite_cache(tmp_path: Path):
+    path = tmp_path / "mure-cache.sqlite"
+    request = Request("GET", "https://httpbin.org/get")
+    response = Response(ok=True, status=200, reason="OK", url="https://httpbin.org/get", text="ü")
+
+    with SQLiteCache(path) as cache:
+        assert not cache.has(request)
+        assert cache.get(request) is None
+
+        cache.set(request, response)
+
+        assert cache.has(request)
+        assert fields(cache.get(request)) == fields(response)
+        cached = asyncio.run(cache.aget_many([request, request]))
+        assert [fields(response) for response in cached] == [fields(response)] * 2
+
+    # responses are persisted
+    with SQLiteCache(path) as cache:
+        assert fields(cache.get(request)) == fields(response)
+
+        # including their headers and caching metadata
+        response.headers = Headers([("Content-Type", "text/plain"), ("Vary", "a"), ("Vary", "b")])
+        response.freshness = Freshness(stored=1.0, lifetime=60, etag='"abc"')
+        cache.set(request, response)
+        assert cache.get(request).headers.multi_items() == response.headers.multi_items()
+        assert vars(cache.get(request).freshness) == vars(response.freshness)
+
+
+def _write(path: Path, worker: int):
+    with SQLiteCache(path) as cache:
+        cache.set_many(
+            (
+                Request("GET", f"https://httpbin.org/get?worker={worker}&id={i}"),
+                Response(ok=False, status=404, reason="Not Found", url="", text=str(i)),
+            )
+            for i in range(100)
+        )
+
+
+def test_sqlite_cache_processes(tmp_path: Path):
+    path = tmp_path / "mure-cache.sqlite"
+    SQLiteCache(path).close()
+
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        pool.starmap(_write, [(path, worker) for worker in range(4)])
+
+    requests = [
+        Request("GET", f"https://httpbin.org/get?worker={worker}&id={i}")
+        for worker in range(4)
+        for i in range(100)
+    ]
+    with SQLiteCache(path) as cache:
+        responses = cache.get_many(requests)
+
+    assert all(response is not None and not response.ok for response in responses)
+
+
+def test_sqlite_cache_eviction(tmp_path: Path):
+    requests = [Request("GET", f"https://httpbin.org/get?id={i}") for i in range(3)]
+    response = Response(ok=True, status=200, reason="OK", url="", text="")
+
+    with SQLiteCache(tmp_path / "mure-cache.sqlite", max_entries=2) as cache:
+        for request in requests:
+            cache.set(request, response)
+        # replacing a response does not add another one
+        cache.set(requests[2], response)
+
+        assert [cache.has(request) for request in requests] == [False, True, True]
+        assert cache.evictions == 1
+
+    # the number of responses is kept across connections
+    with SQLiteCache(tmp_path / "mure-cache.sqlite", max_entries=2) as cache:
+        cache.set(requests[0], response)
+
+        assert [cache.has(request) for request in requests] == [True, False, True]
+        assert cache.evictions == 1
+
+
+class BatchRecordingCache(MemoryCache):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches: list[int] = []
+
+    def set_many(self, pairs: Iterable[tuple[Request, Response]]):
+        pairs = list(pairs)
+        self.batches.append(len(pairs))
+        super().set_many(pairs)
+
+
+def test_tiered_cache(tmp_path: Path):
+    requests = [Request("GET", f"https://httpbin.org/get?id={i}") for i in range(3)]
+    responses = [
+        Response(ok=True, status=200, reason="OK", url=request.url, text=str(i))
+        for i, request in enumerate(requests)
+    ]
+
+    memory = BatchRecordingCache(max_entries=1)
+    disk = SQLiteCache(tmp_path / "mure-cache.sqlite")
+    cache = TieredCache(memory, disk)
+
+    cache.set_many(zip(requests[:2], responses[:2], strict=True))
+    assert len(memory) == 1
+    assert disk.has(requests[0])
+
+    # the first response is only on disk and promoted to memory
+    assert cache.get(requests[0]).text == "0"
+    assert memory.has(requests[0])
+    assert cache.get(requests[0]) is not None
+    assert cache.get(requests[2]) is None
+
+    assert cache.lookups == [3, 2]
+    assert cache.hits == [1, 1]
+    assert cache.hit_ratios == [1 / 3, 1 / 2]
+
+    # the asynchronous methods go through the tiers as well
+    cached = asyncio.run(cache.aget_many(requests))
+    assert [response and response.text for response in cached] == ["0", "1", None]
+
+    # only lookups that found a response in a later tier promote it
+    assert memory.batches == [2, 1, 1]
+
+    with pytest.raises(ValueError):
+        TieredCache()
+
+
+def test_tiered_cache_write_behind(tmp_path: Path):
+    requests = [Request("GET", f"https://httpbin.org/get?id={i}") for i in range(3)]
+    response = Response(ok=True, status=200, reason="OK", url="", text="")
+
+    memory = MemoryCache(max_entries=1)
+    disk = SQLiteCache(tmp_path / "mure-cache.sqlite")
+
+    with TieredCache(memory, disk, write_behind=True, write_batch=3) as cache:
+        cache.set(requests[0], response)
+        cache.set(requests[1], response)
+        assert not disk.has(requests[0])
+
+        # evicted from memory, but still pending for the disk
+        assert cache.get(requests[0]) is not None
+        assert disk.has(requests[0])
+        assert disk.has(requests[1])
+
+        cache.set(requests[2], response)
+
+    # pending responses are saved when leaving the context
+    assert disk.has(requests[2])
+
+
+def test_write_behind_cache():
+    requests = [Request("GET", f"https://httpbin.org/get?id={i}") for i in range(5)]
+    response = Response(ok=True, status=200, reason="OK", url="", text="")
+
+    backend = BatchRecordingCache()
+    with WriteBehindCache(backend, max_batch=2, max_delay=60) as cache:
+        cache.set_many((request, response) for request in requests)
+
+        # queued responses are visible right away
+        assert cache.get_many(requests) == [response] * 5
+
+        cache.flush()
+        assert backend.batches == [2, 2, 1]
+        assert all(backend.has(request) for request in requests)
+
+    # responses saved after closing the cache are saved right away
+    cache.set(Request("GET", "https://httpbin.org/get"), response)
+    assert backend.batches == [2, 2, 1, 1]
+
+
+def test_write_behind_cache_delay():
+    request = Request("GET", "https://httpbin.org/get")
+    response = Response(ok=True, status=200, reason="OK", url="", text="")
+
+    backend = BatchRecordingCache()
+    cache = WriteBehindCache(backend, max_batch=100, max_delay=0.01)
+    cache.set(request, response)
+
+    time.sleep(0.1)
+    assert backend.batches == [1]
+
+    # queued responses are saved when the cache is garbage collected
+    cache.set(request, response)
+    del cache
+    gc.collect()
+    assert backend.batches == [1, 1]
+
+
+class ThreadRecordingCache(MemoryCache):
+    def __init__(self):
+        super().__init__()
+        self.threads: set[str] = set()
+
+    def get(self, request: Request) -> Response | None:
+        self.threads.add(threading.current_thread().name)
+        return super().get(request)
+
+    def set(self, request: Request, response: Response):
+        self.threads.add(threading.current_thread().name)
+        super().set(request, response)
+
+
+def test_async_offloading():
+    class BlockingCache(ThreadRecordingCache):
+        aget = Cache.aget
+        aset = Cache.aset
+        aget_many = Cache.aget_many
+        aset_many = Cache.aset_many
+
+    request = Request("GET", "https://httpbin.org/get")
+    response = Response(ok=True, status=200, reason="OK", url="https://httpbin.org/get", text="")
+
+    async def main(cache: ThreadRecordingCache) -> set[str]:
+        await cache.aset_many([(request, response)])
+        assert await cache.aget_many([request]) == [response]
+        assert await cache.aget(request) == response
+        return cache.threads
+
+    # blocking caches run in their own thread, in-memory caches on the event loop
+    assert {name.split("_")[0] for name in asyncio.run(main(BlockingCache()))} == {"mure-cache"}
+    assert asyncio.run(main(ThreadRecordingCache())) == {threading.current_thread().name}
+
+
+def test_async_flush(tmp_path: Path):
+    flushed: list[str] = []
+
+    class BufferingCache(ThreadRecordingCache):
+        aflush = Cache.aflush
+
+        def flush(self):
+            flushed.append(threading.current_thread().name)
+
+    cache = SQLiteCache(tmp_path / "mure-cache.sqlite")
+    asyncio.run(cache.aflush())
+    # caches without buffered writes have nothing to flush, so no thread is started
+    assert getattr(cache, "_executor", None) is None
+
+    asyncio.run(BufferingCache().aflush())
+    assert [name.split("_")[0] for name in flushed] == ["mure-cache"]
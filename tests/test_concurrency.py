@@ -0,0 +1,64 @@
+import pytest
+
+from mure.concurrency import AdaptiveConcurrency
+from mure.models import Response
+
+ORIGIN = "https://httpbin.org:443"
+
+
+def response(status: int) -> Response:
+    return Response(ok=status == 200, status=status, reason=None, url="", text="")
+
+
+def test_slow_start():
+    adaptive = AdaptiveConcurrency(initial=2, threshold=4)
+
+    for _ in range(2):
+        adaptive.record(ORIGIN, 0.1, response(200), active=adaptive.limit(ORIGIN), now=0)
+    assert adaptive.limit(ORIGIN) == 4
+
+    # roughly one per round trip after the slow-start
+    for _ in range(5):
+        adaptive.record(ORIGIN, 0.1, response(200), active=adaptive.limit(ORIGIN), now=0)
+    assert adaptive.limit(ORIGIN) == 5
+
+
+def test_no_increase_below_limit():
+    adaptive = AdaptiveConcurrency(initial=4)
+
+    adaptive.record(ORIGIN, 0.1, response(200), active=1, now=0)
+
+    assert adaptive.limit(ORIGIN) == 4
+
+
+def test_decrease():
+    adaptive = AdaptiveConcurrency(limits={ORIGIN: 16})
+
+    adaptive.record(ORIGIN, 0.1, response(200), active=16, now=0)
+    adaptive.record(ORIGIN, 0.1, response(429), active=16, now=1)
+    assert adaptive.limit(ORIGIN) == 8
+
+    # failures of requests that were in flight before are ignored
+    adaptive.record(ORIGIN, 0.1, response(0), active=8, now=1.05)
+    assert adaptive.limit(ORIGIN) == 8
+
+    adaptive.record(ORIGIN, 0.1, response(503), active=8, now=2)
+    assert adaptive.limits == {ORIGIN: 4}
+
+
+def test_latency_decrease():
+    adaptive = AdaptiveConcurrency(limits={ORIGIN: 10}, sample_size=4)
+
+    adaptive.record(ORIGIN, 0.1, response(200), active=10, now=0)
+    adaptive.record(ORIGIN, 0.5, response(200), active=10, now=1)
+
+    assert adaptive.limit(ORIGIN) == 5
+
+
+@pytest.mark.parametrize(
+    "limits",
+    [{"minimum": 0}, {"minimum": 2, "initial": 1}, {"initial": 4, "maximum": 2}],
+)
+def test_invalid_limits(limits: dict[str, int]):
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(**limits)
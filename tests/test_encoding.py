@@ -0,0 +1,80 @@
+import codecs
+
+import chardet
+import pytest
+
+import mure.encoding
+from mure.encoding import EncodingDetector
+
+TEXT = "Die Straße führt über die Brücke nach Köln, wo es schöne Gebäude gibt. " * 20
+
+
+@pytest.fixture
+def detections(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    sizes: list[int] = []
+    original = chardet.detect
+
+    def detect(content: bytes) -> dict:
+        sizes.append(len(content))
+        return original(content)
+
+    monkeypatch.setattr(mure.encoding.chardet, "detect", detect)
+    return sizes
+
+
+def test_declared(detections: list[int]):
+    detector = EncodingDetector()
+
+    assert detector.decode(TEXT.encode("latin-1"), "latin-1") == TEXT
+    assert detector.decode(codecs.BOM_UTF8 + TEXT.encode(), None) == TEXT
+    assert detector.decode(codecs.BOM_UTF16_LE + TEXT.encode("utf-16-le"), None) == TEXT
+
+    html = f'<html><head><meta charset="iso-8859-1"></head><body>{TEXT}</body></html>'
+    assert detector.decode(html.encode("latin-1"), None) == html
+    xml = f"<?xml version='1.0' encoding='latin-1'?><text>{TEXT}</text>"
+    assert detector.decode(xml.encode("latin-1"), "no-such-encoding") == xml
+
+    # codecs that are not text encodings are ignored
+    assert detector.decode(TEXT.encode(), "base64") == TEXT
+    html = f'<html><head><meta charset="hex"></head><body>{TEXT}</body></html>'
+    assert detector.decode(html.encode(), None) == html
+
+    # valid UTF-8 is never detected statistically
+    assert detector.decode(TEXT.encode(), None) == TEXT
+    assert detections == []
+
+
+def test_detected(detections: list[int]):
+    detector = EncodingDetector(sample_size=100)
+    content = TEXT.encode("latin-1")
+
+    assert detector.decode(content, None, key=("example.org", "text/plain")) == TEXT
+    # only a prefix of the body is used
+    assert detections == [100]
+
+    # the detected encoding is memoized per key
+    assert detector.decode(content, None, key=("example.org", "text/plain")) == TEXT
+    assert detections == [100]
+    assert detector.decode(content, None, key=("example.org", "text/html")) == TEXT
+    assert detections == [100, 100]
+
+
+def test_memo_size(detections: list[int]):
+    detector = EncodingDetector(memo_size=1)
+    content = TEXT.encode("latin-1")
+
+    for key in "a", "b", "a":
+        detector.decode(content, None, key=key)
+
+    assert len(detections) == 3
+
+
+def test_memo_hit(detections: list[int]):
+    detector = EncodingDetector(memo_size=2)
+    content = TEXT.encode("latin-1")
+
+    # looking up a memoized encoding does not evict another one
+    for key in "a", "b", "b", "a":
+        detector.decode(content, None, key=key)
+
+    assert len(detections) == 2
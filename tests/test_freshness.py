@@ -0,0 +1,88 @@
+from email.utils import formatdate
+
+import httpx
+
+from mure.freshness import CachePolicy, parse_cache_control, parse_http_date
+from mure.models import Freshness, Response
+
+NOW = 1_700_000_000.0
+
+
+def response(freshness: Freshness | None) -> Response:
+    return Response(ok=True, status=200, reason="OK", url="", text="", freshness=freshness)
+
+
+def test_lifetime():
+    policy = CachePolicy(default_lifetime=5)
+
+    def lifetime(**headers: str) -> float:
+        headers = {name.replace("_", "-"): value for name, value in headers.items()}
+        return policy.freshness(httpx.Headers(headers), NOW).lifetime
+
+    date = formatdate(NOW, usegmt=True)
+    assert lifetime(cache_control="public, max-age=60", expires=date) == 60
+    assert lifetime(cache_control="no-cache, max-age=60") == 0
+    assert lifetime(date=date, expires=formatdate(NOW + 30, usegmt=True)) == 30
+    assert lifetime(expires="0") == 0
+    # heuristic based on the last modification
+    assert lifetime(date=date, last_modified=formatdate(NOW - 1000, usegmt=True)) == 100
+    assert lifetime() == 5
+
+    assert policy.freshness(httpx.Headers({"Cache-Control": "no-store"}), NOW) is None
+
+
+def test_is_fresh():
+    policy = CachePolicy()
+    freshness = policy.freshness(httpx.Headers({"Cache-Control": "max-age=60", "Age": "50"}), NOW)
+
+    assert policy.is_fresh(response(freshness), NOW + 9)
+    assert not policy.is_fresh(response(freshness), NOW + 10)
+    assert not policy.is_fresh(response(None), NOW)
+
+
+def test_revalidation():
+    policy = CachePolicy()
+    headers = httpx.Headers({"ETag": '"abc"', "Last-Modified": "Tue, 14 Nov 2023 22:13:20 GMT"})
+    stale = response(policy.freshness(headers, NOW))
+
+    assert policy.conditional_headers(stale) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Tue, 14 Nov 2023 22:13:20 GMT",
+    }
+    assert policy.conditional_headers(response(None)) == {}
+
+    not_modified = Response(
+        ok=False,
+        status=304,
+        reason="Not Modified",
+        url="",
+        text="",
+        freshness=policy.freshness(httpx.Headers({"Cache-Control": "max-age=60"}), NOW + 100),
+    )
+    refreshed = policy.refresh(stale, not_modified)
+
+    assert refreshed.status == 200
+    assert refreshed.freshness.etag == '"abc"'
+    assert policy.is_fresh(refreshed, NOW + 150)
+
+
+def test_parse():
+    assert parse_cache_control('Max-Age=60, private="x", no-cache') == {
+        "max-age": "60",
+        "private": "x",
+        "no-cache": None,
+    }
+    assert parse_http_date(formatdate(NOW, usegmt=True)) == NOW
+    assert parse_http_date("invalid") is None
+    assert parse_http_date(None) is None
+
+
+def test_serves_stale():
+    freshness = Freshness(stored=NOW, lifetime=60)
+
+    assert not CachePolicy().serves_stale(response(freshness), NOW + 70)
+    assert CachePolicy(stale_while_revalidate=30).serves_stale(response(freshness), NOW + 70)
+    assert not CachePolicy(stale_while_revalidate=30).serves_stale(response(freshness), NOW + 90)
+
+    freshness.must_revalidate = True
+    assert not CachePolicy(stale_while_revalidate=30).serves_stale(response(freshness), NOW + 70)
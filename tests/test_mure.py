@@ -1,10 +1,34 @@
+import asyncio
+import gc
+import time
+from functools import partial
 from json import JSONDecodeError
 
+import httpx
 import pytest
 
 import mure
-from mure.cache import MemoryCache
-from mure.models import Request, Resource, Response
+import mure.iterator
+import mure.session
+from mure.cache import MemoryCache, WriteBehindCache
+from mure.concurrency import AdaptiveConcurrency
+from mure.freshness import CachePolicy
+from mure.models import Freshness, Request, Resource, Response
+from mure.ratelimit import RateLimiter
+from mure.retry import RetryPolicy
+
+
+async def handler(request: httpx.Request) -> httpx.Response:
+    # the last path segment is interpreted as the delay in seconds
+    await asyncio.sleep(float(request.url.path.rsplit("/", 1)[-1] or 0))
+    return httpx.Response(200, text=str(request.url))
+
+
+@pytest.fixture
+def mock_transport(monkeypatch: pytest.MonkeyPatch):
+    client = partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(mure.iterator, "AsyncClient", client)
+    monkeypatch.setattr(mure.session, "AsyncClient", client)
 
 
 def test_get():
@@ -58,3 +82,744 @@ def test_cache():
     next(mure.get([resource], cache=cache))
 
     assert cache.has(request)
+
+
+@pytest.mark.usefixtures("mock_transport")
+def test_unordered():
+    resources: list[Resource] = [
+        {"url": "https://example.org/delay/0.3"},
+        {"url": "https://example.org/delay/0"},
+        {"url": "https://example.org/delay/0.1"},
+    ]
+
+    responses = list(mure.get(resources, batch_size=3, ordered=False))
+
+    assert [index for index, _ in responses] == [1, 2, 0]
+    assert all(response.url == resources[index]["url"] for index, response in responses)
+
+
+@pytest.mark.usefixtures("mock_transport")
+def test_ordered():
+    resources: list[Resource] = [
+        {"url": "https://example.org/delay/0.3"},
+        {"url": "https://example.org/delay/0"},
+        {"url": "https://example.org/delay/0.1"},
+    ]
+
+    responses = list(mure.get(resources, batch_size=2))
+
+    assert [response.url for response in responses] == [resource["url"] for resource in resources]
+
+
+@pytest.mark.usefixtures("mock_transport")
+def test_lazy_resources():
+    consumed = 0
+
+    def resources():
+        nonlocal consumed
+        while True:
+            consumed += 1
+            yield {"url": f"https://example.org/{consumed}/0"}
+
+    responses = mure.get(resources(), batch_size=3)
+
+    assert [next(responses).ok for _ in range(5)] == [True] * 5
+    # only the window is pulled from the infinite generator
+    assert consumed <= 5 + 3
+
+
+@pytest.mark.usefixtures("mock_transport")
+def test_unknown_length():
+    requests = (Request("GET", "https://example.org/0") for _ in range(2))
+    responses = mure.iterator.ResponseIterator(requests)
+
+    with pytest.raises(TypeError):
+        len(responses)
+
+    assert len(list(responses)) == 2
+
+
+@pytest.mark.usefixtures("mock_transport")
+def test_session():
+    resources: list[Resource] = [
+        {"url": "https://example.org/delay/0.1"},
+        {"url": "https://example.org/delay/0"},
+    ]
+
+    with mure.Session() as session:
+        client = session._client
+
+        for _ in range(2):
+            responses = list(session.get(resources))
+            assert [response.url for response in responses] == [r["url"] for r in resources]
+
+        # the client is shared across calls and not closed by the iterators
+        assert session._client is client
+        assert not client.is_closed
+
+    assert session.closed
+    assert client.is_closed
+
+    with pytest.raises(RuntimeError):
+        session.get(resources)
+
+
+@pytest.mark.usefixtures("mock_transport")
+def test_async():
+    resources: list[Resource] = [
+        {"url": "https://example.org/delay/0.2"},
+        {"url": "https://example.org/delay/0"},
+    ]
+
+    async def main():
+        # runs on the caller's event loop alongside other tasks
+        other = asyncio.create_task(asyncio.sleep(0.1, result="done"))
+        ordered = [response.url async for response in mure.aget(resources)]
+        unordered = [index async for index, _ in mure.aget(resources, ordered=False)]
+        return ordered, unordered, await other
+
+    ordered, unordered, other = asyncio.run(main())
+
+    assert ordered == [resource["url"] for resource in resources]
+    assert unordered == [1, 0]
+    assert other == "done"
+
+
+@pytest.mark.usefixtures("mock_transport")
+def test_async_close():
+    async def main():
+        responses = mure.aget({"url": f"https://example.org/{i}/0.1"} for i in range(10))
+        await anext(responses)
+        await responses.aclose()
+        return asyncio.all_tasks()
+
+    # no requests are left behind after closing the generator early
+    assert len(asyncio.run(main())) == 1
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+def test_prefetch(monkeypatch: pytest.MonkeyPatch):
+    fetched = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal fetched
+        fetched += 1
+        return httpx.Response(200)
+
+    # the iterator opens (and closes) its own client
+    client = partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(mure.iterator, "AsyncClient", client)
+
+    def consume(*, prefetch: bool) -> int:
+        nonlocal fetched
+        fetched = 0
+
+        requests = [Request("GET", f"https://example.org/{i}") for i in range(10)]
+        with mure.iterator.ResponseIterator(
+            requests, batch_size=2, prefetch=prefetch
+        ) as responses:
+            next(responses)
+            # simulate a slow consumer
+            time.sleep(0.2)
+            return fetched
+
+    # the window and the buffer are filled while the consumer is busy
+    assert consume(prefetch=True) == 5
+    assert consume(prefetch=False) < 5
+
+
+def test_prefetch_with_loop():
+    loop = asyncio.new_event_loop()
+    try:
+        with pytest.raises(ValueError):
+            mure.iterator.ResponseIterator([], loop=loop, prefetch=True)
+    finally:
+        loop.close()
+
+
+def test_host_limit():
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+    started: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        started.append(host)
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.05)
+        active[host] -= 1
+        return httpx.Response(200, text=str(request.url))
+
+    urls = [f"https://a.org/{i}" for i in range(6)] + [f"https://b.org/{i}" for i in range(2)]
+    responses = mure.iterator.ResponseIterator(
+        [Request("GET", url) for url in urls],
+        batch_size=4,
+        host_limit=2,
+        lookahead=4,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    assert [response.url for response in responses] == urls
+    assert peak == {"a.org": 2, "b.org": 2}
+    # requests for b.org skipped ahead of the ones for the saturated a.org
+    assert started[:4] == ["a.org", "a.org", "b.org", "b.org"]
+
+
+def test_origin():
+    assert Request("GET", "https://httpbin.org/get?a=1").origin == "https://httpbin.org:443"
+    assert Request("GET", "http://localhost:8080/").origin == "http://localhost:8080"
+    assert Request("GET", "invalid").origin == "://:"
+
+
+def test_rate_limit():
+    sent: list[float] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(time.monotonic())
+        return httpx.Response(200)
+
+    responses = mure.iterator.ResponseIterator(
+        [Request("GET", f"https://example.org/{i}") for i in range(6)],
+        batch_size=6,
+        rate_limit=RateLimiter(20, burst=2),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    assert all(response.ok for response in responses)
+    # two requests are sent right away, the remaining four one every 50 ms
+    assert sent[-1] - sent[0] >= 0.19
+
+
+def test_adaptive():
+    active = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active
+        if active >= 4:
+            return httpx.Response(503)
+
+        active += 1
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200)
+
+    adaptive = AdaptiveConcurrency(latency_tolerance=100)
+    responses = mure.iterator.ResponseIterator(
+        [Request("GET", f"https://example.org/{i}") for i in range(100)],
+        batch_size=20,
+        adaptive=adaptive,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    statuses = [response.status for response in responses]
+
+    assert statuses.count(200) > 80
+    assert 1 <= adaptive.limits["https://example.org:443"] <= 5
+
+
+def test_retry():
+    started: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        started.append(request.url.path)
+        # the first attempt for /0 fails, all other requests succeed
+        if started.count("/0") == 1 and request.url.path == "/0":
+            return httpx.Response(503)
+        return httpx.Response(200)
+
+    responses = mure.iterator.ResponseIterator(
+        [Request("GET", f"https://example.org/{i}") for i in range(2)],
+        batch_size=1,
+        lookahead=1,
+        retry=RetryPolicy(backoff=0.1, jitter=False),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    assert [(response.status, response.attempts) for response in responses] == [(200, 2), (200, 1)]
+    # the second request takes the slot while the first one backs off
+    assert started == ["/0", "/1", "/0"]
+
+
+def test_retry_exhausted():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("unreachable")
+
+    responses = mure.iterator.ResponseIterator(
+        [Request("GET", "https://example.org/")],
+        retry=RetryPolicy(attempts=3, backoff=0.01),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    response = next(responses)
+    assert response.status == 0
+    assert response.attempts == 3
+
+
+def test_retry_deadline():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    responses = mure.iterator.ResponseIterator(
+        [Request("GET", "https://example.org/")],
+        retry=RetryPolicy(attempts=10, backoff=0.1, jitter=False, deadline=0.25),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    # attempts after 0, 0.1 and 0.3 seconds, the latter exceeds the deadline
+    assert next(responses).attempts == 2
+
+
+def test_coalesce():
+    sent: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(str(request.url))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=str(request.url))
+
+    urls = ["https://example.org/a", "https://example.org/b", "https://example.org/a"] * 2
+    responses = mure.iterator.ResponseIterator(
+        [Request("GET", url) for url in urls] + [Request("POST", urls[0])] * 2,
+        batch_size=8,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    assert [response.text for response in responses] == urls + [urls[0]] * 2
+    # duplicates share a fetch, requests with side effects are always sent
+    assert sorted(sent) == sorted(
+        ["https://example.org/a", "https://example.org/b"] + [urls[0]] * 2
+    )
+
+
+def test_coalesce_headers():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=request.headers.get("Authorization", ""))
+
+    url = "https://example.org/"
+    responses = mure.iterator.ResponseIterator(
+        [
+            Request("GET", url, headers={"Authorization": "alice"}),
+            Request("GET", url, headers={"Authorization": "bob"}),
+            Request("GET", url, headers={"authorization": "alice"}),
+        ],
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    # requests with different headers may get different responses, so they are not coalesced
+    assert [response.text for response in responses] == ["alice", "bob", "alice"]
+
+
+def test_cache_hits_skip_window():
+    sent: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(str(request.url))
+        return httpx.Response(200, text=str(request.url))
+
+    cache = MemoryCache()
+    requests = [Request("GET", f"https://example.org/{i}") for i in range(20)]
+    for request in requests[1:-1]:
+        cache.set(request, Response(ok=True, status=200, reason="OK", url="", text=request.url))
+
+    responses = mure.iterator.ResponseIterator(
+        requests,
+        batch_size=1,
+        cache=cache,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    assert [response.text for response in responses] == [request.url for request in requests]
+    assert sent == [requests[0].url, requests[-1].url]
+    # misses are saved to the cache
+    assert cache.has(requests[-1])
+
+
+def test_revalidate():
+    sent: list[tuple[str, str | None]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append((request.url.path, request.headers.get("If-None-Match")))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"Cache-Control": "max-age=60"})
+        if request.url.path == "/private":
+            return httpx.Response(200, text="private", headers={"Cache-Control": "no-store"})
+        return httpx.Response(
+            200, text="v1", headers={"ETag": '"v1"', "Cache-Control": "no-cache"}
+        )
+
+    cache = MemoryCache()
+    requests = [
+        Request("GET", "https://example.org/"),
+        Request("GET", "https://example.org/private"),
+    ]
+
+    def fetch() -> list[Response]:
+        return list(
+            mure.iterator.ResponseIterator(
+                requests,
+                cache=cache,
+                cache_policy=CachePolicy(),
+                client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            )
+        )
+
+    assert [response.text for response in fetch()] == ["v1", "private"]
+    # the stale response is revalidated, a 304 refreshes it
+    assert [response.text for response in fetch()] == ["v1", "private"]
+    # the refreshed response is fresh for a minute
+    assert [(response.status, response.text) for response in fetch()] == [
+        (200, "v1"),
+        (200, "private"),
+    ]
+
+    assert sent == [("/", None), ("/private", None), ("/", '"v1"')] + [("/private", None)] * 2
+    assert not cache.has(requests[1])
+
+
+def test_stale_while_revalidate():
+    active: list[int] = [0, 0]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        active[0] += 1
+        active[1] = max(active)
+        # the foreground request outlasts the background revalidations
+        await asyncio.sleep(0.3 if request.url.path == "/3" else 0.05)
+        active[0] -= 1
+        return httpx.Response(
+            200, text="v2", headers={"ETag": '"v2"', "Cache-Control": "max-age=60"}
+        )
+
+    cache = MemoryCache()
+    requests = [Request("GET", f"https://example.org/{i}") for i in range(4)]
+    for i, request in enumerate(requests):
+        freshness = Freshness(
+            stored=time.time() - 100, lifetime=10, etag='"v1"', must_revalidate=i == 3
+        )
+        cache.set(
+            request,
+            Response(ok=True, status=200, reason="OK", url="", text="v1", freshness=freshness),
+        )
+
+    responses = mure.iterator.ResponseIterator(
+        requests,
+        batch_size=1,
+        cache=cache,
+        cache_policy=CachePolicy(stale_while_revalidate=3600, background_limit=1),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    # stale responses are used right away, unless they must be revalidated first
+    assert [response.text for response in responses] == ["v1", "v1", "v1", "v2"]
+    # the background revalidations updated the cache one at a time (plus the foreground one),
+    # the third one was skipped because the queue (as big as the window) was full
+    assert [response.text for response in cache.get_many(requests)] == ["v2", "v2", "v1", "v2"]
+    assert active[1] == 2
+
+
+def test_stale_while_revalidate_bound():
+    sent: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, headers={"Cache-Control": "max-age=60"})
+
+    cache = MemoryCache()
+    requests = [Request("GET", f"https://example.org/{i}") for i in range(100)]
+    freshness = Freshness(stored=time.time() - 100, lifetime=10, etag='"v1"')
+    for request in requests:
+        cache.set(
+            request,
+            Response(ok=True, status=200, reason="OK", url="", text="v1", freshness=freshness),
+        )
+
+    responses = mure.iterator.ResponseIterator(
+        requests,
+        batch_size=1,
+        cache=cache,
+        cache_policy=CachePolicy(stale_while_revalidate=3600, background_limit=2),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    assert [response.text for response in responses] == ["v1"] * 100
+    # the stale hits outran the revalidations, which were skipped instead of queued (and the
+    # ones that were still waiting at the end were not started)
+    assert len(sent) <= 3
+
+
+def test_write_behind():
+    cache = MemoryCache()
+    requests = [Request("GET", f"https://example.org/{i}") for i in range(3)]
+
+    responses = mure.iterator.ResponseIterator(
+        requests,
+        cache=WriteBehindCache(cache, max_delay=60),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(lambda _: httpx.Response(200))),
+    )
+
+    assert len(list(responses)) == 3
+    # the iterator flushes the queued responses when it is closed
+    assert len(cache) == 3
+
+
+def test_headers():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, headers={"Content-Type": "text/plain", "Connection": "close", "X-Id": "1"}
+        )
+
+    response = next(
+        mure.iterator.ResponseIterator(
+            [Request("GET", "https://example.org/")],
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+    )
+
+    assert response.headers["x-id"] == "1"
+    assert response.content_type == "text/plain"
+    assert response.http_version == "HTTP/1.1"
+    # headers of the connection are not kept
+    assert "connection" not in response.headers
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+def test_close():
+    sent: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.url.path)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200)
+
+    requests = [Request("GET", f"https://example.org/{i}") for i in range(10)]
+
+    with mure.iterator.ResponseIterator(
+        requests, batch_size=2, client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    ) as responses:
+        next(responses)
+
+    # outstanding requests are cancelled and no further ones are started
+    assert len(sent) <= 3
+    with pytest.raises(StopIteration):
+        next(responses)
+
+    # an abandoned iterator is finalized without running its loop inside another loop
+    responses = mure.iterator.ResponseIterator(
+        requests, batch_size=2, client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    next(responses)
+    del responses
+
+    async def main():
+        gc.collect()
+
+    asyncio.run(main())
+    gc.collect()
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 20])
+@pytest.mark.usefixtures("mock_transport")
+def test_window_sizes(batch_size: int):
+    # delays decrease, so later requests in the window finish first
+    resources: list[Resource] = [
+        {"url": f"https://example.org/{i}/{(10 - i) / 200}"} for i in range(10)
+    ]
+
+    ordered = list(mure.get(resources, batch_size=batch_size))
+    unordered = list(mure.get(resources, batch_size=batch_size, ordered=False))
+
+    assert [response.url for response in ordered] == [r["url"] for r in resources]
+    assert sorted(index for index, _ in unordered) == list(range(10))
+    assert all(response.url == resources[index]["url"] for index, response in unordered)
+    if batch_size > 1:
+        # within a window, faster responses are yielded first
+        assert [index for index, _ in unordered] != list(range(10))
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_failed_request(ordered: bool):  # noqa: FBT001
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/1":
+            raise httpx.ConnectError("unreachable")
+        await asyncio.sleep(0.01)
+        return httpx.Response(200)
+
+    requests = [Request("GET", f"https://example.org/{i}") for i in range(6)]
+    responses = mure.iterator.ResponseIterator(
+        requests,
+        batch_size=2,
+        ordered=ordered,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    statuses = dict(enumerate(responses)) if ordered else dict(responses)
+
+    # the failed request takes its slot in the ring without stalling the others
+    assert {index: response.status for index, response in statuses.items()} == {
+        i: 0 if i == 1 else 200 for i in range(6)
+    }
+
+
+def test_error_in_window():
+    class Error(Exception):
+        pass
+
+    class BrokenAdaptive(AdaptiveConcurrency):
+        def record(self, origin, latency, response, *, active, now):
+            if response.url.endswith("/1"):
+                raise Error
+            super().record(origin, latency, response, active=active, now=now)
+
+    responses = mure.iterator.ResponseIterator(
+        [Request("GET", f"https://example.org/{i}") for i in range(3)],
+        batch_size=3,
+        adaptive=BrokenAdaptive(initial=3),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(lambda _: httpx.Response(200))),
+    )
+
+    # errors while processing a request are raised at its position instead of stalling the ring
+    assert next(responses).ok
+    with pytest.raises(Error):
+        next(responses)
+
+
+def test_cache_lookups_in_chunks():
+    class CountingCache(MemoryCache):
+        def __init__(self):
+            super().__init__()
+            self.lookups: list[int] = []
+
+        def get_many(self, requests):
+            requests = list(requests)
+            self.lookups.append(len(requests))
+            return super().get_many(requests)
+
+    cache = CountingCache()
+    requests = [Request("GET", f"https://example.org/{i}") for i in range(40)]
+    for request in requests[10:]:
+        cache.set(request, Response(ok=True, status=200, reason="OK", url="", text=request.url))
+
+    responses = mure.iterator.ResponseIterator(
+        requests,
+        batch_size=4,
+        cache=cache,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(lambda _: httpx.Response(200))),
+    )
+
+    assert len(list(responses)) == 40
+    # the window is refilled once at least half of it is free
+    assert min(cache.lookups[:-1]) >= 2
+    assert len(cache.lookups) <= 20
+
+
+def test_cache_hits_without_position():
+    active: list[int] = [0, 0]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        active[0] += 1
+        active[1] = max(active)
+        await asyncio.sleep(0.05)
+        active[0] -= 1
+        return httpx.Response(200, text=str(request.url))
+
+    cache = MemoryCache()
+    requests = [Request("GET", f"https://example.org/{i}") for i in range(3)]
+    cache.set(
+        requests[1], Response(ok=True, status=200, reason="OK", url="", text=requests[1].url)
+    )
+
+    responses = mure.iterator.ResponseIterator(
+        requests,
+        batch_size=2,
+        cache=cache,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    assert [response.text for response in responses] == [request.url for request in requests]
+    # the hit waiting behind the first request does not keep the third one out of the window
+    assert active[1] == 2
+
+
+def test_saves_per_window():
+    sent: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.url.path)
+        # the last path segment is interpreted as the delay in seconds
+        await asyncio.sleep(float(request.url.path.rsplit("/", 1)[-1]))
+        return httpx.Response(200, text=request.url.path)
+
+    class CountingCache(MemoryCache):
+        def __init__(self):
+            super().__init__()
+            self.saves: list[int] = []
+
+        def set_many(self, pairs):
+            pairs = list(pairs)
+            self.saves.append(len(pairs))
+            super().set_many(pairs)
+
+    def fetch(paths: list[str]) -> list[str]:
+        responses = mure.iterator.ResponseIterator(
+            [Request("GET", f"https://example.org{path}") for path in paths],
+            batch_size=4,
+            cache=cache,
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        return [response.text for response in responses]
+
+    cache = CountingCache()
+    paths = [f"/{i}/0" for i in range(20)]
+
+    assert fetch(paths) == paths
+    assert sum(cache.saves) == 20
+    assert len(cache.saves) <= 20 // 4 + 1
+
+    sent.clear()
+    paths = ["/a/0", "/b/0", "/c/0.05", "/d/0.05", "/a/0"]
+
+    assert fetch(paths) == paths
+    # the duplicate is admitted after the first request finished, but before its response
+    # is saved, and uses it instead of fetching it again
+    assert sorted(sent) == sorted(paths[:-1])
+
+
+@pytest.mark.usefixtures("mock_transport")
+def test_close_with_failing_cache():
+    class BrokenCache(MemoryCache):
+        async def aset_many(self, pairs):
+            raise OSError("disk full")
+
+    async def main():
+        responses = mure.iterator.ResponseIterator(
+            [Request("GET", f"https://example.org/{i}/{min(i, 1)}") for i in range(10)],
+            batch_size=2,
+            lookahead=8,
+            cache=BrokenCache(),
+        )
+        await anext(responses)
+        with pytest.raises(OSError):
+            await responses.aclose()
+        return asyncio.all_tasks()
+
+    # requests in flight are cancelled even if saving the responses fails
+    assert len(asyncio.run(main())) == 1
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+@pytest.mark.usefixtures("mock_transport")
+def test_session_close_unfinished():
+    session = mure.Session()
+    responses = session.get({"url": f"https://example.org/{i}/0.05"} for i in range(10))
+    next(responses)
+
+    # closing the session cancels the requests of the unfinished iterator
+    session.close()
+
+    with pytest.raises(StopIteration):
+        next(responses)
+
+    del responses
+    gc.collect()
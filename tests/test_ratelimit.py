@@ -0,0 +1,40 @@
+import pytest
+
+from mure.ratelimit import RateLimiter, TokenBucket
+
+
+def test_token_bucket():
+    bucket = TokenBucket(2, burst=2)
+
+    # burst is available right away
+    for _ in range(2):
+        assert bucket.wait(0) == 0
+        bucket.take()
+
+    assert bucket.wait(0) == pytest.approx(0.5)
+    assert bucket.wait(0.5) == 0
+    bucket.take()
+
+    # never refills beyond the burst
+    assert bucket.wait(100) == 0
+    bucket.take()
+    bucket.take()
+    assert bucket.wait(100) > 0
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(10, burst=1, hosts={"*.example.org": (1, 1)})
+
+    assert limiter.per_host
+    assert limiter.acquire("https://api.example.org:443", 0) == 0
+    assert limiter.acquire("https://api.example.org:443", 0.1) == pytest.approx(0.9)
+    # other hosts only share the global bucket
+    assert limiter.acquire("https://httpbin.org:443", 0.1) == 0
+    assert limiter.acquire("https://httpbin.org:443", 0.15) == pytest.approx(0.05)
+    # a rejected request does not take a global token
+    assert limiter.acquire("https://www.example.org:443", 0.2) == 0
+
+
+def test_invalid_token_bucket():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
@@ -0,0 +1,51 @@
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from mure.retry import RetryPolicy, parse_retry_after
+
+
+def test_delay():
+    policy = RetryPolicy(attempts=4, backoff=1, max_backoff=3, jitter=False)
+
+    assert policy.delay("GET", 1, status=503) == 1
+    assert policy.delay("GET", 2, status=503) == 2
+    assert policy.delay("GET", 3, error=httpx.ConnectTimeout("timeout")) == 3
+    # no attempts left
+    assert policy.delay("GET", 4, status=503) is None
+
+
+def test_no_retry():
+    policy = RetryPolicy()
+
+    assert policy.delay("GET", 1, status=200) is None
+    assert policy.delay("GET", 1, status=404) is None
+    assert policy.delay("GET", 1, error=httpx.UnsupportedProtocol("invalid")) is None
+    # not idempotent
+    assert policy.delay("POST", 1, status=503) is None
+
+
+def test_jitter():
+    policy = RetryPolicy(backoff=1)
+
+    assert all(0 <= policy.delay("GET", 2, status=503) <= 2 for _ in range(100))
+
+
+def test_retry_after():
+    policy = RetryPolicy(backoff=0.1, jitter=False)
+
+    assert policy.delay("GET", 1, status=429, headers=httpx.Headers({"Retry-After": "5"})) == 5
+    assert RetryPolicy(respect_retry_after=False, backoff=0.1, jitter=False).delay(
+        "GET", 1, status=429, headers=httpx.Headers({"Retry-After": "5"})
+    ) == pytest.approx(0.1)
+
+
+def test_parse_retry_after():
+    date = format_datetime(datetime.now(UTC) + timedelta(seconds=30), usegmt=True)
+
+    assert parse_retry_after("120") == 120
+    assert 28 < parse_retry_after(date) <= 30
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("invalid") == 0